@@ -2,20 +2,30 @@
 Analyze F-Droid app metrics data from HTTP servers
 """
 
+import heapq
 import json
 import logging
 import pathlib
-from datetime import datetime
+import threading
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
 
 import pandas as pd
 
-from etl.config import cache_config
+from etl.config import cache_config, processing_config
+from etl.dates import scan_date_files
 from etl.getdata_apps import SERVERS
 from etl.getdata_apps import SUB_DATA_DIR as DATA_DIR
 from etl.security import safe_open
 
 logger = logging.getLogger(__name__)
 
+# Sort key for (key, hits) pairs
+_HITS_KEY = itemgetter(1)
+
 
 class AppMetricsAnalyzer:
     """Analyzer for F-Droid app metrics data from HTTP servers."""
@@ -31,9 +41,23 @@ class AppMetricsAnalyzer:
         if data_dir is None:
             data_dir = DATA_DIR
         self.data_dir = data_dir
-        self._cache: dict[str, dict] = {}
+        # The analyzer is shared by all Streamlit sessions, so the LRU caches
+        # below are only read and updated under this lock
+        self._cache_lock = threading.Lock()
+        self._cache: OrderedDict[str, dict] = OrderedDict()
         self._cache_size_limit = cache_config.APP_CACHE_SIZE
 
+        # Merged per-date payloads, shared by all the multi-date analyses,
+        # stored with the signature of the server files they were built from
+        self._merged_cache: OrderedDict[str, tuple[tuple[int, ...], dict]] = (
+            OrderedDict()
+        )
+        self._merged_cache_size_limit = cache_config.APP_MERGED_CACHE_SIZE
+
+        # Available dates, invalidated when a server directory's mtime changes
+        self._dates_cache: list[str] | None = None
+        self._dates_signature: tuple[tuple[str, int], ...] | None = None
+
         # HTTP servers to aggregate data from
         self.servers = SERVERS
 
@@ -49,23 +73,62 @@ class AppMetricsAnalyzer:
             Sorted list of date strings in YYYY-MM-DD format found
             across all server data directories.
         """
+        signature = self._get_dates_signature()
+        if self._dates_cache is not None and signature == self._dates_signature:
+            return list(self._dates_cache)
+
         dates: set[str] = set()
 
         for server in self.servers:
-            server_dir = self.data_dir / server
-            if not server_dir.exists():
-                continue
+            dates.update(scan_date_files(self.data_dir / server))
+
+        self._dates_cache = sorted(dates)
+        self._dates_signature = signature
+        return list(self._dates_cache)
 
-            for file in server_dir.glob("*.json"):
-                try:
-                    date_str = file.stem
-                    # Validate date format
-                    datetime.strptime(date_str, "%Y-%m-%d")
-                    dates.add(date_str)
-                except ValueError:
-                    continue
+    def _get_dates_signature(self) -> tuple[tuple[str, int], ...]:
+        """
+        Get a cheap fingerprint of the server data directories.
 
-        return sorted(dates)
+        A directory's mtime changes whenever a file is added to or removed
+        from it, so an unchanged signature means the set of date files is
+        unchanged too.
+
+        Returns:
+            Tuple of (server, mtime_ns) pairs, with 0 for missing directories
+        """
+        signature: list[tuple[str, int]] = []
+        for server in self.servers:
+            try:
+                mtime_ns = (self.data_dir / server).stat().st_mtime_ns
+            except OSError:
+                mtime_ns = 0
+            signature.append((server, mtime_ns))
+        return tuple(signature)
+
+    def _get_files_signature(self, date: str) -> tuple[int, ...]:
+        """
+        Get a cheap signature of the server data files for a date.
+
+        A file's mtime changes whenever it is downloaded again, and a file
+        that appears or disappears changes its entry to or from 0, so an
+        unchanged signature means a merged payload built from the files is
+        still current.
+
+        Args:
+            date: Date string in YYYY-MM-DD format
+
+        Returns:
+            Tuple of mtime_ns values in server order, 0 for missing files
+        """
+        signature: list[int] = []
+        for server in self.servers:
+            try:
+                mtime_ns = (self.data_dir / server / f"{date}.json").stat().st_mtime_ns
+            except OSError:
+                mtime_ns = 0
+            signature.append(mtime_ns)
+        return tuple(signature)
 
     def load_data(self, date: str, server: str) -> dict:
         """
@@ -83,8 +146,12 @@ class AppMetricsAnalyzer:
             json.JSONDecodeError: If data file contains invalid JSON
         """
         cache_key = f"{server}_{date}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        with self._cache_lock:
+            data = self._cache.get(cache_key)
+            if data is not None:
+                # Mark as most recently used
+                self._cache.move_to_end(cache_key)
+                return data
 
         file_path = self.data_dir / server / f"{date}.json"
         if not file_path.exists():
@@ -93,15 +160,95 @@ class AppMetricsAnalyzer:
         with safe_open(file_path, encoding="utf-8") as f:
             data = json.load(f)
 
-        # Simple cache size management - remove oldest entries if cache is too large
-        if len(self._cache) >= self._cache_size_limit:
-            # Remove the first (oldest) cache entry
-            oldest_key = next(iter(self._cache))
-            del self._cache[oldest_key]
-
-        self._cache[cache_key] = data
+        self._store_cached_data(cache_key, data)
         return data
 
+    def _store_cached_data(self, cache_key: str, data: dict) -> None:
+        """
+        Insert a per-server payload into the LRU cache.
+
+        Args:
+            cache_key: Key in "{server}_{date}" form
+            data: Parsed metrics data
+        """
+        with self._cache_lock:
+            self._cache[cache_key] = data
+
+            # LRU eviction - drop the least recently used entries beyond the limit
+            while len(self._cache) > self._cache_size_limit:
+                self._cache.popitem(last=False)
+
+    def _read_server_files(self, date: str, servers: list[str]) -> dict[str, dict]:
+        """
+        Read and parse the data files of the given servers for a date.
+
+        Runs on a background thread, so it never touches the caches.
+        Unreadable files are skipped and left for load_data to report.
+
+        Args:
+            date: Date string in YYYY-MM-DD format
+            servers: Servers whose files should be read
+
+        Returns:
+            Dictionary mapping server names to their parsed data
+        """
+        server_data: dict[str, dict] = {}
+        for server in servers:
+            file_path = self.data_dir / server / f"{date}.json"
+            try:
+                with safe_open(file_path, encoding="utf-8") as f:
+                    server_data[server] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        return server_data
+
+    def _prefetched(self, dates: list[str]) -> Iterator[str]:
+        """
+        Iterate over dates while reading upcoming dates' files in the background.
+
+        File reads and JSON parsing for the next few dates overlap with the
+        caller merging and aggregating the current one. Prefetched payloads
+        are moved into the cache on the calling thread just before each
+        date is yielded, so load_data finds them there.
+
+        Args:
+            dates: Dates in the order they will be processed
+
+        Yields:
+            The dates, unchanged and in order
+        """
+        if len(dates) < 2:
+            yield from dates
+            return
+
+        def submit(date: str) -> Future[dict[str, dict]] | None:
+            with self._cache_lock:
+                if date in self._merged_cache:
+                    return None
+                missing = [s for s in self.servers if f"{s}_{date}" not in self._cache]
+            if not missing:
+                return None
+            return executor.submit(self._read_server_files, date, missing)
+
+        upcoming = iter(dates)
+        pending: deque[tuple[str, Future[dict[str, dict]] | None]] = deque()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for date in upcoming:
+                pending.append((date, submit(date)))
+                if len(pending) > processing_config.PREFETCH_DEPTH:
+                    break
+
+            while pending:
+                date, future = pending.popleft()
+                next_date = next(upcoming, None)
+                if next_date is not None:
+                    pending.append((next_date, submit(next_date)))
+
+                if future is not None:
+                    for server, data in future.result().items():
+                        self._store_cached_data(f"{server}_{date}", data)
+                yield date
+
     def load_merged_data(self, date: str) -> dict:
         """
         Load and merge data from all servers for a specific date.
@@ -117,7 +264,25 @@ class AppMetricsAnalyzer:
             - paths: Request path statistics
             - queries: Query statistics
             - servers: List of servers that had data
+
+        Note:
+            The returned dictionary is cached and shared between callers,
+            so it must not be modified.
         """
+        signature = self._get_files_signature(date)
+        with self._cache_lock:
+            cached = self._merged_cache.get(date)
+            if cached is not None:
+                if cached[0] == signature:
+                    self._merged_cache.move_to_end(date)
+                    return cached[1]
+
+                # Server files were added or re-downloaded since the merge;
+                # drop the stale payloads so they are read again
+                self._merged_cache.pop(date, None)
+                for server in self.servers:
+                    self._cache.pop(f"{server}_{date}", None)
+
         merged_data: dict = {
             "hits": 0,
             "errors": {},
@@ -213,6 +378,13 @@ class AppMetricsAnalyzer:
             except FileNotFoundError:
                 continue
 
+        # Don't cache dates with no local data yet, so a later fetch shows up
+        if merged_data["servers"]:
+            with self._cache_lock:
+                self._merged_cache[date] = (signature, merged_data)
+                while len(self._merged_cache) > self._merged_cache_size_limit:
+                    self._merged_cache.popitem(last=False)
+
         return merged_data
 
     def get_daily_summary(self, date: str) -> dict:
@@ -239,19 +411,19 @@ class AppMetricsAnalyzer:
         if dates is None:
             dates = self.get_available_dates()
 
-        records = []
-        for date in dates:
+        # Processing dates in order yields rows already sorted by date, so
+        # the columns can be built directly without a post-hoc sort
+        summary_columns = (
+            "total_hits",
+            "servers_active",
+            "total_errors",
+            "unique_paths",
+        )
+        columns: dict[str, list] = {"date": []}
+        columns.update((column, []) for column in summary_columns)
+        for date in self._prefetched(sorted(dates)):
             try:
                 summary = self.get_daily_summary(date)
-                records.append(
-                    {
-                        "date": pd.to_datetime(date),
-                        "total_hits": summary["total_hits"],
-                        "servers_active": summary["servers_active"],
-                        "total_errors": summary["total_errors"],
-                        "unique_paths": summary["unique_paths"],
-                    }
-                )
             except FileNotFoundError:
                 # Skip missing data files
                 continue
@@ -260,7 +432,13 @@ class AppMetricsAnalyzer:
                 logger.warning(f"Error processing date {date}: {e}")
                 continue
 
-        return pd.DataFrame(records).sort_values("date")
+            columns["date"].append(date)
+            for column in summary_columns:
+                columns[column].append(summary[column])
+
+        df = pd.DataFrame(columns)
+        df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
+        return df
 
     def get_path_analysis(self, dates: list[str] | None = None) -> pd.DataFrame:
         """
@@ -276,9 +454,11 @@ class AppMetricsAnalyzer:
         if dates is None:
             dates = self.get_available_dates()
 
-        # Collect all path-date combinations
-        path_records = []
-        for date in dates:
+        # Collect all path-date combinations as parallel columns
+        record_paths: list[str] = []
+        record_dates: list[str] = []
+        record_hits: list[int] = []
+        for date in self._prefetched(dates):
             try:
                 data = self.load_merged_data(date)
                 paths = data.get("paths", {})
@@ -290,7 +470,9 @@ class AppMetricsAnalyzer:
                         else path_data
                     )
                     if hits > 0:  # Only include paths with actual hits
-                        path_records.append({"path": path, "date": date, "hits": hits})
+                        record_paths.append(path)
+                        record_dates.append(date)
+                        record_hits.append(hits)
 
             except FileNotFoundError:
                 # Skip missing data files
@@ -301,16 +483,22 @@ class AppMetricsAnalyzer:
                 continue
 
         # Convert to DataFrame and use vectorized operations
-        if not path_records:
+        if not record_paths:
             return pd.DataFrame(
                 columns=["path", "total_hits", "appearances", "avg_hits", "dates"]
             )
 
-        df = pd.DataFrame(path_records)
+        df = pd.DataFrame(
+            {
+                "path": pd.Categorical(record_paths),
+                "date": record_dates,
+                "hits": record_hits,
+            }
+        )
 
-        # Group by path and aggregate
+        # Group by path and aggregate (categorical keys group on integer codes)
         path_analysis = (
-            df.groupby("path")
+            df.groupby("path", observed=True)
             .agg(
                 total_hits=("hits", "sum"),
                 appearances=("date", "count"),  # Count of dates with hits
@@ -318,6 +506,7 @@ class AppMetricsAnalyzer:
             )
             .reset_index()
         )
+        path_analysis["path"] = path_analysis["path"].astype(str)
 
         # Calculate average hits per active week
         path_analysis["avg_hits"] = (
@@ -339,18 +528,20 @@ class AppMetricsAnalyzer:
         if dates is None:
             dates = self.get_available_dates()
 
-        # Collect all country-date combinations
-        country_records = []
-        for date in dates:
+        # Collect all country-date combinations as parallel columns
+        record_countries: list[str] = []
+        record_dates: list[str] = []
+        record_hits: list[int] = []
+        for date in self._prefetched(dates):
             try:
                 data = self.load_merged_data(date)
                 countries = data.get("hitsPerCountry", {})
 
                 for country, hits in countries.items():
                     if hits > 0:  # Only include countries with actual hits
-                        country_records.append(
-                            {"country": country, "date": date, "hits": hits}
-                        )
+                        record_countries.append(country)
+                        record_dates.append(date)
+                        record_hits.append(hits)
 
             except FileNotFoundError:
                 # Skip missing data files
@@ -361,22 +552,29 @@ class AppMetricsAnalyzer:
                 continue
 
         # Convert to DataFrame and use vectorized operations
-        if not country_records:
+        if not record_countries:
             return pd.DataFrame(
                 columns=["country", "total_hits", "appearances", "avg_hits"]
             )
 
-        df = pd.DataFrame(country_records)
+        df = pd.DataFrame(
+            {
+                "country": pd.Categorical(record_countries),
+                "date": record_dates,
+                "hits": record_hits,
+            }
+        )
 
-        # Group by country and aggregate
+        # Group by country and aggregate (categorical keys group on integer codes)
         country_analysis = (
-            df.groupby("country")
+            df.groupby("country", observed=True)
             .agg(
                 total_hits=("hits", "sum"),
                 appearances=("date", "count"),  # Count of dates with hits
             )
             .reset_index()
         )
+        country_analysis["country"] = country_analysis["country"].astype(str)
 
         # Calculate average hits per active week
         country_analysis["avg_hits"] = (
@@ -432,21 +630,22 @@ class AppMetricsAnalyzer:
             dates = self.get_available_dates()
 
         package_data = {}
+        prefix = self.API_PACKAGES_PREFIX
+        prefix_len = len(prefix)
 
-        for date in dates:
+        # Active dates are tracked as compact arrays of indices into `dates`
+        # and only turned back into date strings once, at the end
+        for date_index, date in enumerate(self._prefetched(dates)):
             try:
                 data = self.load_merged_data(date)
                 paths = data.get("paths", {})
 
                 for path, path_data in paths.items():
                     # Filter for package API paths
-                    if path.startswith(self.API_PACKAGES_PREFIX):
-                        # Extract package name from path
-                        package_name = (
-                            path.replace(self.API_PACKAGES_PREFIX, "")
-                            .strip()
-                            .strip("/")
-                        )
+                    if path.startswith(prefix):
+                        # Slice off the fixed-length prefix rather than scanning
+                        # the whole path with replace()
+                        package_name = path[prefix_len:].strip().strip("/")
 
                         # Skip empty or invalid package names
                         if not package_name or "/" in package_name:
@@ -457,7 +656,7 @@ class AppMetricsAnalyzer:
                                 "package_name": package_name,
                                 "total_hits": 0,
                                 "appearances": 0,
-                                "dates": [],
+                                "dates": array("I"),
                                 "avg_hits": 0,
                             }
 
@@ -470,7 +669,7 @@ class AppMetricsAnalyzer:
                         # Only count as an appearance if there were actual hits
                         if hits > 0:
                             package_data[package_name]["appearances"] += 1
-                            package_data[package_name]["dates"].append(date)
+                            package_data[package_name]["dates"].append(date_index)
 
             except FileNotFoundError:
                 # Skip missing data files
@@ -480,16 +679,22 @@ class AppMetricsAnalyzer:
                 logger.warning(f"Error processing date {date}: {e}")
                 continue
 
-        # Calculate averages
+        # Calculate averages and resolve the active dates
         for pkg_stats in package_data.values():
+            pkg_stats["dates"] = [dates[i] for i in pkg_stats["dates"]]
             if pkg_stats["appearances"] > 0:
                 pkg_stats["avg_hits"] = (
                     pkg_stats["total_hits"] / pkg_stats["appearances"]
                 )
 
-        # Convert to DataFrame
+        # Convert to DataFrame column by column, so each column is built
+        # directly as its own 1-D array rather than via a row-major
+        # object matrix from a list of dicts
         if package_data:
-            df = pd.DataFrame(list(package_data.values()))
+            stats = list(package_data.values())
+            df = pd.DataFrame(
+                {column: [pkg[column] for pkg in stats] for column in stats[0]}
+            )
             return df.sort_values("total_hits", ascending=False)
         else:
             return pd.DataFrame()
@@ -509,6 +714,10 @@ class AppMetricsAnalyzer:
         if not data:
             return []
 
+        # Flat mappings can be selected from directly
+        if not any(isinstance(value, dict) for value in data.values()):
+            return heapq.nlargest(limit, data.items(), key=_HITS_KEY)
+
         # Handle nested dictionaries (like queries with metadata)
         items: list[tuple[str, int]] = []
         for key, value in data.items():
@@ -518,7 +727,8 @@ class AppMetricsAnalyzer:
                 hits = value
             items.append((key, hits))
 
-        return sorted(items, key=lambda x: x[1], reverse=True)[:limit]
+        # Partial selection; ties keep their input order, as with a stable sort
+        return heapq.nlargest(limit, items, key=_HITS_KEY)
 
     def get_package_downloads(
         self, package_id: str, dates: list[str] | None = None
@@ -544,7 +754,7 @@ class AppMetricsAnalyzer:
             "dates_active": [],
         }
 
-        for date in dates:
+        for date in self._prefetched(dates):
             try:
                 data = self.load_merged_data(date)
                 paths = data.get("paths", {})
@@ -630,9 +840,15 @@ class AppMetricsAnalyzer:
         if dates is None:
             dates = self.get_available_dates()
 
-        # Collect all package activity records
-        package_records = []
-        for date in dates:
+        # Collect all package activity records as parallel columns
+        record_packages: list[str] = []
+        record_dates: list[str] = []
+        record_versions: list[str | None] = []
+        record_downloads: list[int] = []
+        record_api_hits: list[int] = []
+        api_prefix = self.API_PACKAGES_PREFIX
+        api_prefix_len = len(api_prefix)
+        for date in self._prefetched(dates):
             try:
                 data = self.load_merged_data(date)
                 paths = data.get("paths", {})
@@ -665,29 +881,21 @@ class AppMetricsAnalyzer:
                             parts = filename.rsplit("_", 1)
                             if len(parts) == 2:
                                 pkg_name, version = parts
-                                package_records.append(
-                                    {
-                                        "package_id": pkg_name,
-                                        "date": date,
-                                        "version": version,
-                                        "downloads": hits,
-                                        "api_hits": 0,
-                                    }
-                                )
+                                record_packages.append(pkg_name)
+                                record_dates.append(date)
+                                record_versions.append(version)
+                                record_downloads.append(hits)
+                                record_api_hits.append(0)
 
                     # Check for API hits
-                    elif path.startswith(self.API_PACKAGES_PREFIX) and hits > 0:
-                        pkg_name = path.replace(self.API_PACKAGES_PREFIX, "").strip()
+                    elif path.startswith(api_prefix) and hits > 0:
+                        pkg_name = path[api_prefix_len:].strip()
                         if pkg_name and "/" not in pkg_name:
-                            package_records.append(
-                                {
-                                    "package_id": pkg_name,
-                                    "date": date,
-                                    "version": None,  # No version for API hits
-                                    "downloads": 0,
-                                    "api_hits": hits,
-                                }
-                            )
+                            record_packages.append(pkg_name)
+                            record_dates.append(date)
+                            record_versions.append(None)  # No version for API hits
+                            record_downloads.append(0)
+                            record_api_hits.append(hits)
 
             except FileNotFoundError:
                 continue
@@ -696,7 +904,7 @@ class AppMetricsAnalyzer:
                 continue
 
         # Convert to DataFrame and use vectorized operations
-        if not package_records:
+        if not record_packages:
             return pd.DataFrame(
                 columns=[
                     "package_id",
@@ -707,11 +915,19 @@ class AppMetricsAnalyzer:
                 ]
             )
 
-        df = pd.DataFrame(package_records)
+        df = pd.DataFrame(
+            {
+                "package_id": pd.Categorical(record_packages),
+                "date": record_dates,
+                "version": record_versions,
+                "downloads": record_downloads,
+                "api_hits": record_api_hits,
+            }
+        )
 
-        # Group by package_id and aggregate
+        # Group by package_id and aggregate (categorical keys group on integer codes)
         package_analysis = (
-            df.groupby("package_id")
+            df.groupby("package_id", observed=True)
             .agg(
                 total_downloads=("downloads", "sum"),
                 total_versions=(
@@ -723,5 +939,6 @@ class AppMetricsAnalyzer:
             )
             .reset_index()
         )
+        package_analysis["package_id"] = package_analysis["package_id"].astype(str)
 
         return package_analysis.sort_values("total_downloads", ascending=False)
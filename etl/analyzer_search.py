@@ -2,19 +2,28 @@
 Analyze F-Droid search metrics data
 """
 
+import heapq
 import json
 import logging
 import pathlib
-from datetime import datetime
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
 
 import pandas as pd
 
-from etl.config import cache_config
+from etl.config import cache_config, processing_config
+from etl.dates import scan_date_files
 from etl.getdata_search import SUB_DATA_DIR as DATA_DIR
 from etl.security import safe_open
 
 logger = logging.getLogger(__name__)
 
+# Sort key for (key, hits) pairs
+_HITS_KEY = itemgetter(1)
+
 
 class SearchMetricsAnalyzer:
     """Analyzer for F-Droid search metrics data."""
@@ -30,8 +39,22 @@ class SearchMetricsAnalyzer:
         if data_dir is None:
             data_dir = DATA_DIR
         self.data_dir = data_dir
-        self._cache: dict[str, dict] = {}
+
+        # Per-date LRU caches, each entry stored with the mtime of the data
+        # file it was built from so a re-downloaded file is picked up. The
+        # analyzer is shared by all Streamlit sessions, so the caches are
+        # only read and updated under the lock.
+        self._cache_lock = threading.Lock()
+        self._cache: OrderedDict[str, tuple[int, dict]] = OrderedDict()
         self._cache_size_limit = cache_config.SEARCH_CACHE_SIZE
+        self._columns_cache: OrderedDict[
+            tuple[str, str], tuple[int, tuple[list, list]]
+        ] = OrderedDict()
+        self._summary_cache: OrderedDict[str, tuple[int, dict]] = OrderedDict()
+
+        # Available dates, invalidated when the data directory's mtime changes
+        self._dates_cache: list[str] | None = None
+        self._dates_mtime_ns: int | None = None
 
     def get_available_dates(self) -> list[str]:
         """
@@ -41,17 +64,16 @@ class SearchMetricsAnalyzer:
             Sorted list of date strings in YYYY-MM-DD format found
             in the data directory.
         """
-        dates: list[str] = []
-        for file in self.data_dir.glob("*.json"):
-            if file.name != "last_submitted_to_cimp.json":
-                try:
-                    date_str = file.stem
-                    # Validate date format
-                    datetime.strptime(date_str, "%Y-%m-%d")
-                    dates.append(date_str)
-                except ValueError:
-                    continue
-        return sorted(dates)
+        try:
+            mtime_ns = self.data_dir.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        if self._dates_cache is not None and mtime_ns == self._dates_mtime_ns:
+            return list(self._dates_cache)
+
+        self._dates_cache = scan_date_files(self.data_dir)
+        self._dates_mtime_ns = mtime_ns
+        return list(self._dates_cache)
 
     def load_data(self, date: str) -> dict:
         """
@@ -67,28 +89,192 @@ class SearchMetricsAnalyzer:
             FileNotFoundError: If data file doesn't exist for the given date
             json.JSONDecodeError: If data file contains invalid JSON
         """
-        if date in self._cache:
-            return self._cache[date]
+        return self._load_current(date)[1]
+
+    def _file_mtime_ns(self, date: str) -> int:
+        """
+        Get the modification time of the data file for a date.
+
+        Args:
+            date: Date string in YYYY-MM-DD format
+
+        Returns:
+            The file's mtime in nanoseconds, or 0 if it doesn't exist
+        """
+        try:
+            return (self.data_dir / f"{date}.json").stat().st_mtime_ns
+        except OSError:
+            return 0
+
+    def _load_current(self, date: str) -> tuple[int, dict]:
+        """
+        Load data for a date, re-reading it if the file changed since cached.
 
-        file_path = self.data_dir / f"{date}.json"
-        if not file_path.exists():
+        Args:
+            date: Date string in YYYY-MM-DD format
+
+        Returns:
+            Tuple of the file's mtime when read and the parsed data
+
+        Raises:
+            FileNotFoundError: If data file doesn't exist for the given date
+            json.JSONDecodeError: If data file contains invalid JSON
+        """
+        mtime_ns = self._file_mtime_ns(date)
+        with self._cache_lock:
+            cached = self._cache.get(date)
+            if cached is not None and cached[0] == mtime_ns:
+                self._cache.move_to_end(date)
+                return cached
+
+        if not mtime_ns:
             raise FileNotFoundError(f"No data found for date {date}")
 
-        with safe_open(file_path, encoding="utf-8") as f:
-            data = json.load(f)
+        # Parse the raw bytes directly, skipping the text decoding layer
+        with safe_open(self.data_dir / f"{date}.json", "rb") as f:
+            data = json.loads(f.read())
+
+        self._store_cached_data(date, mtime_ns, data)
+        return mtime_ns, data
 
-        # Simple cache size management - remove oldest entries if cache is too large
-        if len(self._cache) >= self._cache_size_limit:
-            # Remove the first (oldest) cache entry
-            oldest_key = next(iter(self._cache))
-            del self._cache[oldest_key]
+    def _store_cached_data(self, date: str, mtime_ns: int, data: dict) -> None:
+        """
+        Insert a per-date payload into the LRU cache.
 
-        self._cache[date] = data
-        return data
+        Args:
+            date: Date string in YYYY-MM-DD format
+            mtime_ns: Modification time of the file the data was read from
+            data: Parsed metrics data
+        """
+        with self._cache_lock:
+            self._cache[date] = (mtime_ns, data)
+
+            # LRU eviction - drop the least recently used entries beyond the limit
+            while len(self._cache) > self._cache_size_limit:
+                self._cache.popitem(last=False)
+
+    def _read_file(self, date: str) -> tuple[int, dict] | None:
+        """
+        Read and parse the data file for a date.
+
+        Runs on a background thread, so it never touches the caches.
+        Unreadable files are skipped and left for load_data to report.
+
+        Args:
+            date: Date string in YYYY-MM-DD format
+
+        Returns:
+            Tuple of the file's mtime and the parsed data, or None if the
+            file could not be read
+        """
+        # Stat before reading: if the file is replaced in between, the
+        # older mtime makes the next lookup read it again
+        mtime_ns = self._file_mtime_ns(date)
+        try:
+            with safe_open(self.data_dir / f"{date}.json", "rb") as f:
+                return mtime_ns, json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _prefetched(self, dates: list[str]) -> Iterator[str]:
+        """
+        Iterate over dates while reading upcoming dates' files in the background.
+
+        File reads and JSON parsing for the next few dates overlap with the
+        caller summarizing or aggregating the current one. Prefetched payloads
+        are moved into the cache on the calling thread just before each
+        date is yielded, so load_data finds them there.
+
+        Args:
+            dates: Dates in the order they will be processed
+
+        Yields:
+            The dates, unchanged and in order
+        """
+        if len(dates) < 2:
+            yield from dates
+            return
+
+        def submit(date: str) -> Future[tuple[int, dict] | None] | None:
+            with self._cache_lock:
+                if date in self._cache:
+                    return None
+            return executor.submit(self._read_file, date)
+
+        upcoming = iter(dates)
+        pending: deque[tuple[str, Future[tuple[int, dict] | None] | None]] = deque()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for date in upcoming:
+                pending.append((date, submit(date)))
+                if len(pending) > processing_config.PREFETCH_DEPTH:
+                    break
+
+            while pending:
+                date, future = pending.popleft()
+                next_date = next(upcoming, None)
+                if next_date is not None:
+                    pending.append((next_date, submit(next_date)))
+
+                if future is not None:
+                    result = future.result()
+                    if result is not None:
+                        self._store_cached_data(date, *result)
+                yield date
+
+    def _get_hit_columns(self, date: str, field: str) -> tuple[list[str], list[int]]:
+        """
+        Extract the active entries of a per-key hits mapping for a date.
+
+        The result is memoized per (date, field), so running several
+        analyses over the same dates walks each raw mapping only once.
+
+        Args:
+            date: Date string in YYYY-MM-DD format
+            field: Top-level key of the data, e.g. "queries" or "hitsPerCountry"
+
+        Returns:
+            Tuple of parallel (keys, hits) lists holding the entries with hits > 0
+
+        Raises:
+            FileNotFoundError: If data file doesn't exist for the given date
+            json.JSONDecodeError: If data file contains invalid JSON
+        """
+        cache_key = (date, field)
+        mtime_ns = self._file_mtime_ns(date)
+        with self._cache_lock:
+            cached = self._columns_cache.get(cache_key)
+            if cached is not None and cached[0] == mtime_ns:
+                self._columns_cache.move_to_end(cache_key)
+                return cached[1]
+
+        mtime_ns, data = self._load_current(date)
+        keys: list[str] = []
+        hits_list: list[int] = []
+        for key, value in data.get(field, {}).items():
+            hits = value.get("hits", 0) if isinstance(value, dict) else value
+            if hits > 0:  # Only include entries with actual hits
+                keys.append(key)
+                hits_list.append(hits)
+
+        columns = (keys, hits_list)
+        with self._cache_lock:
+            self._columns_cache[cache_key] = (mtime_ns, columns)
+            while len(self._columns_cache) > cache_config.SEARCH_COLUMNS_CACHE_SIZE:
+                self._columns_cache.popitem(last=False)
+        return columns
 
     def get_daily_summary(self, date: str) -> dict:
         """Get daily summary statistics."""
-        data = self.load_data(date)
+        # Summaries are memoized per date, so the top-N selections over the
+        # raw mappings run once per date rather than on every re-query
+        mtime_ns = self._file_mtime_ns(date)
+        with self._cache_lock:
+            cached = self._summary_cache.get(date)
+            if cached is not None and cached[0] == mtime_ns:
+                self._summary_cache.move_to_end(date)
+                return dict(cached[1])
+
+        mtime_ns, data = self._load_current(date)
 
         summary = {
             "date": date,
@@ -104,25 +290,25 @@ class SearchMetricsAnalyzer:
             "top_paths": self._get_top_items(data.get("paths", {}), 10),
         }
 
-        return summary
+        with self._cache_lock:
+            self._summary_cache[date] = (mtime_ns, summary)
+            while len(self._summary_cache) > cache_config.SEARCH_SUMMARY_CACHE_SIZE:
+                self._summary_cache.popitem(last=False)
+        return dict(summary)
 
     def get_time_series_data(self, dates: list[str] | None = None) -> pd.DataFrame:
         """Get time series data for multiple dates."""
         if dates is None:
             dates = self.get_available_dates()
 
-        records = []
-        for date in dates:
+        # Processing dates in order yields rows already sorted by date, so
+        # the columns can be built directly without a post-hoc sort
+        summary_columns = ("total_hits", "unique_queries", "total_errors")
+        columns: dict[str, list] = {"date": []}
+        columns.update((column, []) for column in summary_columns)
+        for date in self._prefetched(sorted(dates)):
             try:
                 summary = self.get_daily_summary(date)
-                records.append(
-                    {
-                        "date": pd.to_datetime(date),
-                        "total_hits": summary["total_hits"],
-                        "unique_queries": summary["unique_queries"],
-                        "total_errors": summary["total_errors"],
-                    }
-                )
             except FileNotFoundError:
                 # Skip missing data files
                 continue
@@ -131,39 +317,38 @@ class SearchMetricsAnalyzer:
                 logger.warning(f"Error processing date {date}: {e}")
                 continue
 
-        return pd.DataFrame(records).sort_values("date")
+            columns["date"].append(date)
+            for column in summary_columns:
+                columns[column].append(summary[column])
 
-    def get_query_analysis(self, dates: list[str] | None = None) -> pd.DataFrame:
-        """
-        Analyze search queries across multiple dates.
+        df = pd.DataFrame(columns)
+        df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
+        return df
 
-        Returns a DataFrame with columns:
-        - query: The search query text
-        - total_hits: Total hits across all dates
-        - appearances: Number of weeks where the query had hits > 0
-        - avg_hits: Average hits per active week
-        - dates: List of dates where the query was active
+    def _load_hits_long(
+        self, dates: list[str], field: str, key_column: str
+    ) -> pd.DataFrame:
         """
-        if dates is None:
-            dates = self.get_available_dates()
+        Collect the active entries of a per-key hits mapping across dates.
 
-        # Collect all query-date combinations
-        query_records = []
-        for date in dates:
+        Args:
+            dates: List of date strings in YYYY-MM-DD format
+            field: Top-level key of the data, e.g. "queries" or "hitsPerCountry"
+            key_column: Name of the key column in the result
+
+        Returns:
+            Long-form DataFrame with columns key_column (categorical), date
+            and hits, holding one row per active (key, date) combination
+        """
+        record_keys: list[str] = []
+        record_dates: list[str] = []
+        record_hits: list[int] = []
+        for date in self._prefetched(dates):
             try:
-                data = self.load_data(date)
-                queries = data.get("queries", {})
-
-                for query, query_data in queries.items():
-                    hits = (
-                        query_data.get("hits", 0)
-                        if isinstance(query_data, dict)
-                        else query_data
-                    )
-                    if hits > 0:  # Only include queries with actual hits
-                        query_records.append(
-                            {"query": query, "date": date, "hits": hits}
-                        )
+                keys, hits = self._get_hit_columns(date, field)
+                record_keys.extend(keys)
+                record_dates.extend([date] * len(keys))
+                record_hits.extend(hits)
 
             except FileNotFoundError:
                 # Skip missing data files
@@ -173,25 +358,60 @@ class SearchMetricsAnalyzer:
                 logger.warning(f"Error processing date {date}: {e}")
                 continue
 
-        # Convert to DataFrame and use vectorized operations
-        if not query_records:
-            return pd.DataFrame(
-                columns=["query", "total_hits", "appearances", "avg_hits", "dates"]
-            )
+        return pd.DataFrame(
+            {
+                key_column: pd.Categorical(record_keys),
+                "date": record_dates,
+                "hits": record_hits,
+            }
+        )
 
-        df = pd.DataFrame(query_records)
+    def get_query_analysis(
+        self, dates: list[str] | None = None, include_dates: bool = False
+    ) -> pd.DataFrame:
+        """
+        Analyze search queries across multiple dates.
 
-        # Group by query and aggregate
-        query_analysis = (
-            df.groupby("query")
-            .agg(
-                total_hits=("hits", "sum"),
-                appearances=("date", "count"),  # Count of dates with hits
-                dates=("date", lambda x: sorted(x.unique())),
-            )
-            .reset_index()
+        Returns a DataFrame with columns:
+        - query: The search query text
+        - total_hits: Total hits across all dates
+        - appearances: Number of weeks where the query had hits > 0
+        - avg_hits: Average hits per active week
+        - dates: List of dates where the query was active (only if include_dates)
+
+        Args:
+            dates: Dates to analyze. If None, uses all available dates.
+            include_dates: Whether to build the per-query list of active dates
+        """
+        if dates is None:
+            dates = self.get_available_dates()
+
+        df = self._load_hits_long(dates, "queries", "query")
+        if df.empty:
+            columns = ["query", "total_hits", "appearances", "avg_hits"]
+            if include_dates:
+                columns.append("dates")
+            return pd.DataFrame(columns=columns)
+
+        # Sums and counts in one groupby pass (categorical keys group on integer codes)
+        query_analysis = df.groupby("query", observed=True).agg(
+            total_hits=("hits", "sum"),
+            appearances=("hits", "size"),  # Count of dates with hits
         )
 
+        if include_dates:
+            # Active dates per query, built from pre-sorted rows instead of
+            # sorting each group separately
+            query_analysis["dates"] = (
+                df.drop_duplicates(["query", "date"])
+                .sort_values("date", kind="stable")
+                .groupby("query", observed=True)["date"]
+                .agg(list)
+            )
+
+        query_analysis = query_analysis.reset_index()
+        query_analysis["query"] = query_analysis["query"].astype(str)
+
         # Calculate average hits per active week
         query_analysis["avg_hits"] = (
             query_analysis["total_hits"] / query_analysis["appearances"]
@@ -212,44 +432,22 @@ class SearchMetricsAnalyzer:
         if dates is None:
             dates = self.get_available_dates()
 
-        # Collect all country-date combinations
-        country_records = []
-        for date in dates:
-            try:
-                data = self.load_data(date)
-                countries = data.get("hitsPerCountry", {})
-
-                for country, hits in countries.items():
-                    if hits > 0:  # Only include countries with actual hits
-                        country_records.append(
-                            {"country": country, "date": date, "hits": hits}
-                        )
-
-            except FileNotFoundError:
-                # Skip missing data files
-                continue
-            except Exception as e:
-                # Log unexpected errors but continue processing
-                logger.warning(f"Error processing date {date}: {e}")
-                continue
-
-        # Convert to DataFrame and use vectorized operations
-        if not country_records:
+        df = self._load_hits_long(dates, "hitsPerCountry", "country")
+        if df.empty:
             return pd.DataFrame(
                 columns=["country", "total_hits", "appearances", "avg_hits"]
             )
 
-        df = pd.DataFrame(country_records)
-
-        # Group by country and aggregate
+        # Group by country and aggregate (categorical keys group on integer codes)
         country_analysis = (
-            df.groupby("country")
+            df.groupby("country", observed=True)
             .agg(
                 total_hits=("hits", "sum"),
-                appearances=("date", "count"),  # Count of dates with hits
+                appearances=("hits", "size"),  # Count of dates with hits
             )
             .reset_index()
         )
+        country_analysis["country"] = country_analysis["country"].astype(str)
 
         # Calculate average hits per active week
         country_analysis["avg_hits"] = (
@@ -273,6 +471,10 @@ class SearchMetricsAnalyzer:
         if not data:
             return []
 
+        # Flat mappings can be selected from directly
+        if not any(isinstance(value, dict) for value in data.values()):
+            return heapq.nlargest(limit, data.items(), key=_HITS_KEY)
+
         # Handle nested dictionaries (like queries with metadata)
         items: list[tuple[str, int]] = []
         for key, value in data.items():
@@ -282,4 +484,5 @@ class SearchMetricsAnalyzer:
                 hits = value
             items.append((key, hits))
 
-        return sorted(items, key=lambda x: x[1], reverse=True)[:limit]
+        # Partial selection; ties keep their input order, as with a stable sort
+        return heapq.nlargest(limit, items, key=_HITS_KEY)
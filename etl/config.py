@@ -10,7 +10,10 @@ class CacheConfig:
     """Cache configuration settings."""
 
     APP_CACHE_SIZE: int = 100
+    APP_MERGED_CACHE_SIZE: int = 200
     SEARCH_CACHE_SIZE: int = 1000
+    SEARCH_COLUMNS_CACHE_SIZE: int = 2000
+    SEARCH_SUMMARY_CACHE_SIZE: int = 1000
     METADATA_CACHE_SIZE: int = 500
 
 
@@ -22,6 +25,15 @@ class DataFetcherConfig:
     MAX_DATE_RANGE_DAYS: int = 732  # 2 years
     RATE_LIMIT_INTERVAL: float = 0.1  # seconds between requests
     BATCH_SIZE: int = 8  # Number of concurrent requests per batch
+    DOWNLOAD_CHUNK_SIZE: int = 64 * 1024  # bytes per streamed write
+    USER_AGENT: str = "fdroid-metrics/0.1.0"
+    INDEX_CACHE_TTL: int = 300  # seconds before a fetched index.json is revalidated
+    RETRY_TOTAL: int = 4
+    RETRY_BACKOFF_FACTOR: float = 0.5  # 0.5s, 1s, 2s, ... between retries
+    RETRY_BACKOFF_JITTER: float = 0.5  # random extra delay, up to this many seconds
+    STATUS_FORCELIST: tuple[int, ...] = (429, 500, 502, 503, 504)
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # consecutive failures before a host is paused
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # seconds before a paused host is probed again
 
 
 @dataclass(frozen=True)
@@ -29,6 +41,7 @@ class ProcessingConfig:
     """Data processing configuration settings."""
 
     TOP_ITEMS_LIMIT: int = 20  # Default number of top items to return
+    PREFETCH_DEPTH: int = 2  # Dates to read ahead while the current one is merged
 
 
 @dataclass(frozen=True)
@@ -41,6 +54,9 @@ class MetadataConfig:
     RETRY_TOTAL: int = 3
     RETRY_BACKOFF_FACTOR: float = 1.0
     STATUS_FORCELIST: tuple[int, ...] = (429, 500, 502, 503, 504)
+    MAX_WORKERS: int = 8  # Concurrent metadata downloads in bulk lookups
+    RATE_LIMIT_BURST: int = 4  # Requests allowed back to back before spacing applies
+    MISSING_TTL: int = 7 * 24 * 3600  # Seconds a "not in fdroiddata" result is trusted
 
 
 # Instantiate global config objects
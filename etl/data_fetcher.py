@@ -4,13 +4,23 @@ Data fetcher for F-Droid metrics that can be used within Streamlit dashboard
 
 import json
 import logging
+import pathlib
+import threading
+import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Any
+from itertools import islice
+from typing import Any, Self
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 
 from etl.config import fetcher_config
+from etl.dates import date_from_filename, scan_date_files
 
 # Import existing data fetching functions
 from etl.getdata_apps import (
@@ -31,11 +41,84 @@ from etl.getdata_search import (
 from etl.getdata_search import (
     SUB_DATA_DIR as SEARCH_DATA_DIR,
 )
-from etl.security import safe_open
+from etl.http_cache import download_json, flush_validators
 
 logger = logging.getLogger(__name__)
 
 
+class CircuitBreaker:
+    """
+    Per-host circuit breaker shared by the download threads.
+
+    A host's circuit opens after a number of consecutive failures, and
+    requests to it are then refused without being sent. Once the reset
+    timeout has passed, a single probe request is allowed through
+    (half-open): a success closes the circuit, a failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        """
+        Initialize the breaker with all circuits closed.
+
+        Args:
+            failure_threshold: Consecutive failures that open a host's circuit
+            reset_timeout: Seconds to wait before probing an open host again
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures: dict[str, int] = {}
+        self._opened_at: dict[str, float] = {}
+
+    def allow(self, host: str) -> bool:
+        """
+        Check whether a request to a host may be sent.
+
+        Args:
+            host: Host name (network location) of the request
+
+        Returns:
+            True if the circuit is closed or a half-open probe is due
+        """
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - opened_at < self.reset_timeout:
+                return False
+            # Let this request probe the host; restarting the timer keeps
+            # the other threads waiting until the probe has an outcome
+            self._opened_at[host] = now
+            return True
+
+    def record_success(self, host: str) -> None:
+        """
+        Close a host's circuit after a request reached it.
+
+        Args:
+            host: Host name (network location) of the request
+        """
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        """
+        Count a failed request, opening the host's circuit at the threshold.
+
+        Args:
+            host: Host name (network location) of the request
+        """
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.failure_threshold:
+                if host not in self._opened_at:
+                    logger.warning(f"Too many failures, pausing requests to {host}")
+                self._opened_at[host] = time.monotonic()
+
+
 class DataFetcher:
     """Unified data fetcher for both search and app metrics."""
 
@@ -52,6 +135,66 @@ class DataFetcher:
         self.DATA_TYPE_ERROR_MSG = "data_type must be 'search' or 'apps'"
         self.JSON_EXT = ".json"
 
+        # One pooled HTTP session shared by index lookups and all download
+        # threads, so keep-alive connections to each host are reused
+        self.session = requests.Session()
+        # Advertise every content coding urllib3 can decode here (gzip and
+        # deflate, plus br / zstd when brotli / zstandard are installed);
+        # streamed bodies are decompressed before they reach the disk
+        self.session.headers.update(
+            {
+                "User-Agent": fetcher_config.USER_AGENT,
+                "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
+            }
+        )
+        # Transient failures are retried with jittered exponential backoff,
+        # honouring Retry-After, before a download is reported as failed
+        retry_strategy = Retry(
+            total=fetcher_config.RETRY_TOTAL,
+            status_forcelist=fetcher_config.STATUS_FORCELIST,
+            backoff_factor=fetcher_config.RETRY_BACKOFF_FACTOR,
+            backoff_jitter=fetcher_config.RETRY_BACKOFF_JITTER,
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=len(self.servers) + 1,
+            pool_maxsize=fetcher_config.BATCH_SIZE,
+            max_retries=retry_strategy,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Rate limiting shared by all download threads
+        self._rate_limit_lock = threading.Lock()
+        self._next_request_time: float = 0
+        self._circuit_breaker = CircuitBreaker(
+            fetcher_config.CIRCUIT_FAILURE_THRESHOLD,
+            fetcher_config.CIRCUIT_RESET_TIMEOUT,
+        )
+
+        # The fetcher is shared by all Streamlit sessions, so the caches
+        # below may be read and updated from several threads at once
+        self._cache_lock = threading.Lock()
+
+        # Local date listings per data type, keyed by directory mtimes
+        self._local_dates_cache: dict[str, tuple[tuple[int, ...], list[str]]] = {}
+
+        # Remote index files by URL, as (checked at, ETag, Last-Modified, index)
+        self._index_cache: dict[str, tuple[float, str | None, str | None, list]] = {}
+
+    def close(self) -> None:
+        """Close the HTTP session and release its pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> Self:
+        """Use the fetcher as a context manager that closes its session."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the HTTP session on leaving the context."""
+        self.close()
+
     def get_available_remote_dates(self, data_type: str) -> list[str]:
         """
         Get available dates from remote servers.
@@ -72,6 +215,58 @@ class DataFetcher:
         else:
             raise ValueError(self.DATA_TYPE_ERROR_MSG)
 
+    def _get_index(self, url: str) -> list:
+        """
+        Fetch a remote index.json, reusing a recently fetched copy.
+
+        The parsed index is kept in memory together with its ETag /
+        Last-Modified values. Within INDEX_CACHE_TTL seconds of the last
+        check it is returned without any request. After that, the kept
+        validators are sent back as a conditional request, and a 304 reply
+        reuses the kept copy without a body transfer.
+
+        Args:
+            url: URL of the index file
+
+        Returns:
+            The parsed index, a list of file names
+
+        Raises:
+            requests.RequestException: If the request fails
+            json.JSONDecodeError: If the index is not valid JSON
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._index_cache.get(url)
+        headers: dict[str, str] = {}
+        if cached is not None:
+            checked_at, etag, last_modified, index = cached
+            if now - checked_at < fetcher_config.INDEX_CACHE_TTL:
+                return index
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        response = self.session.get(
+            url, headers=headers, timeout=fetcher_config.REQUEST_TIMEOUT
+        )
+        if response.status_code == 304 and cached is not None:
+            with self._cache_lock:
+                self._index_cache[url] = (now, *cached[1:])
+            return cached[3]
+        response.raise_for_status()
+        index = response.json()
+
+        with self._cache_lock:
+            self._index_cache[url] = (
+                now,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                index,
+            )
+        return index
+
     def _get_search_remote_dates(self) -> list[str]:
         """
         Get available search data dates from remote server.
@@ -83,23 +278,13 @@ class DataFetcher:
             Returns empty list if fetching fails (error is logged)
         """
         try:
-            response = requests.get(
-                self.search_index_url, timeout=fetcher_config.REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            index = response.json()
-
-            dates: list[str] = []
-            for filename in index:
-                if filename == "last_submitted_to_cimp.json":
-                    continue
-                try:
-                    date_str = filename.replace(self.JSON_EXT, "")
-                    datetime.strptime(date_str, "%Y-%m-%d")  # Validate format
-                    dates.append(date_str)
-                except ValueError:
-                    continue
+            index = self._get_index(self.search_index_url)
 
+            dates = [
+                date_str
+                for filename in index
+                if (date_str := date_from_filename(filename)) is not None
+            ]
             return sorted(dates)
         except (requests.RequestException, json.JSONDecodeError) as e:
             logger.error(f"Failed to fetch search data index: {e}")
@@ -110,68 +295,65 @@ class DataFetcher:
         Get available app data dates from remote servers.
 
         Returns:
-            Sorted list of date strings available across all app servers
+            Sorted list of distinct date strings available on any app server
 
         Note:
-            Returns empty list if fetching fails (error is logged)
+            Servers whose index fails to fetch are skipped (a warning is logged)
         """
-        try:
-            dates: list[str] = []
-            for server in self.servers:
-                index_url = f"{self.apps_base_url}/{server}/index.json"
-                response = requests.get(
-                    index_url, timeout=fetcher_config.REQUEST_TIMEOUT
-                )
-                response.raise_for_status()
-                index = response.json()
+        return self._merge_server_dates(self._get_apps_per_server_dates())
 
-                for filename in index:
-                    try:
-                        date_str = filename.replace(self.JSON_EXT, "")
-                        datetime.strptime(date_str, "%Y-%m-%d")  # Validate format
-                        dates.append(date_str)
-                    except ValueError:
-                        continue
-
-            return sorted(dates)
-        except (requests.RequestException, json.JSONDecodeError) as e:
-            logger.error(f"Failed to fetch app data index: {e}")
-            return []
+    @staticmethod
+    def _merge_server_dates(server_dates: dict[str, set[str]]) -> list[str]:
+        """Combine per-server date sets into one sorted list of distinct dates."""
+        dates: set[str] = set()
+        for dates_on_server in server_dates.values():
+            dates.update(dates_on_server)
+        return sorted(dates)
 
     def _get_apps_per_server_dates(self) -> dict[str, set[str]]:
         """
         Get available app data dates per server.
 
+        The server indexes are fetched concurrently, so the lookup takes
+        about as long as the slowest server rather than the sum of all.
+
         Returns:
             Dictionary mapping server names to sets of available date strings.
             If a server's index fails to fetch, it maps to an empty set.
         """
-        server_dates: dict[str, set[str]] = {}
-
-        for server in self.servers:
-            try:
-                index_url = f"{self.apps_base_url}/{server}/index.json"
-                response = requests.get(
-                    index_url, timeout=fetcher_config.REQUEST_TIMEOUT
+        if not self.servers:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=len(self.servers)) as executor:
+            return dict(
+                zip(
+                    self.servers,
+                    executor.map(self._get_server_dates, self.servers),
+                    strict=True,
                 )
-                response.raise_for_status()
-                index = response.json()
+            )
 
-                available: set[str] = set()
-                for filename in index:
-                    try:
-                        date_str = filename.replace(self.JSON_EXT, "")
-                        datetime.strptime(date_str, "%Y-%m-%d")
-                        available.add(date_str)
-                    except ValueError:
-                        continue
+    def _get_server_dates(self, server: str) -> set[str]:
+        """
+        Get available app data dates for a single server.
 
-                server_dates[server] = available
-            except (requests.RequestException, json.JSONDecodeError) as e:
-                logger.warning(f"Failed to fetch index for {server}: {e}")
-                server_dates[server] = set()
+        Args:
+            server: Server name
 
-        return server_dates
+        Returns:
+            Set of available date strings, empty if the index fails to fetch
+        """
+        try:
+            index = self._get_index(f"{self.apps_base_url}/{server}/index.json")
+        except (requests.RequestException, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to fetch index for {server}: {e}")
+            return set()
+
+        return {
+            date_str
+            for filename in index
+            if (date_str := date_from_filename(filename)) is not None
+        }
 
     def get_local_dates(self, data_type: str) -> list[str]:
         """
@@ -187,37 +369,35 @@ class DataFetcher:
             ValueError: If data_type is not 'search' or 'apps'
         """
         if data_type == "search":
-            data_dir = self.search_data_dir
+            data_dirs = [self.search_data_dir]
         elif data_type == "apps":
             # For apps, check all server directories
-            dates: set[str] = set()
-            for server in self.servers:
-                server_dir = self.apps_data_dir / server
-                if server_dir.exists():
-                    for file in server_dir.glob("*.json"):
-                        try:
-                            date_str = file.stem
-                            datetime.strptime(date_str, "%Y-%m-%d")
-                            dates.add(date_str)
-                        except ValueError:
-                            continue
-            return sorted(dates)
+            data_dirs = [self.apps_data_dir / server for server in self.servers]
         else:
             raise ValueError(self.DATA_TYPE_ERROR_MSG)
 
-        # For search data
-        dates_list: list[str] = []
-        if data_dir.exists():
-            for file in data_dir.glob("*.json"):
-                if file.name == "last_submitted_to_cimp.json":
-                    continue
-                try:
-                    date_str = file.stem
-                    datetime.strptime(date_str, "%Y-%m-%d")
-                    dates_list.append(date_str)
-                except ValueError:
-                    continue
-        return sorted(dates_list)
+        # A directory's mtime changes whenever a file is added to or removed
+        # from it, so an unchanged signature means an unchanged listing
+        signature: list[int] = []
+        for data_dir in data_dirs:
+            try:
+                signature.append(data_dir.stat().st_mtime_ns)
+            except OSError:
+                signature.append(0)
+
+        with self._cache_lock:
+            cached = self._local_dates_cache.get(data_type)
+        if cached is not None and cached[0] == tuple(signature):
+            return list(cached[1])
+
+        dates: set[str] = set()
+        for data_dir in data_dirs:
+            dates.update(scan_date_files(data_dir))
+
+        dates_list = sorted(dates)
+        with self._cache_lock:
+            self._local_dates_cache[data_type] = (tuple(signature), dates_list)
+        return list(dates_list)
 
     def fetch_date_range(
         self,
@@ -247,8 +427,15 @@ class DataFetcher:
         if (end_dt - start_dt).days > max_days:
             raise ValueError(f"Date range too large. Maximum {max_days} days allowed")
 
-        # Get available dates from index.json and filter by date range
-        available_dates = self.get_available_remote_dates(data_type)
+        # Get available dates from index.json and filter by date range. Apps
+        # also need per-server availability, so derive the combined dates
+        # from a single pass over the server indices
+        server_dates: dict[str, set[str]] = {}
+        if data_type == "apps":
+            server_dates = self._get_apps_per_server_dates()
+            available_dates = self._merge_server_dates(server_dates)
+        else:
+            available_dates = self.get_available_remote_dates(data_type)
         dates_to_fetch = [
             date for date in available_dates if start_date <= date <= end_date
         ]
@@ -261,6 +448,7 @@ class DataFetcher:
             return {
                 "total_files": 0,
                 "successful": 0,
+                "unchanged": 0,
                 "failed": 0,
                 "errors": ["No data files available in the specified date range"],
             }
@@ -270,8 +458,6 @@ class DataFetcher:
                 dates_to_fetch, progress_callback, status_callback
             )
         elif data_type == "apps":
-            # Get per-server availability for apps
-            server_dates = self._get_apps_per_server_dates()
             return self._fetch_apps_dates(
                 dates_to_fetch, server_dates, progress_callback, status_callback
             )
@@ -291,34 +477,21 @@ class DataFetcher:
         results = {
             "total_files": len(dates),
             "successful": 0,
+            "unchanged": 0,
             "failed": 0,
             "errors": [],
         }
 
-        for i, date in enumerate(dates):
-            progress = (i + 1) / len(dates)
-            if progress_callback:
-                progress_callback(progress)
-            if status_callback:
-                status_callback(f"Fetching search data for {date}...")
-
-            filepath = self.search_data_dir / f"{date}.json"
-
-            try:
-                url = f"{self.search_base_url}/{date}.json"
-                response = requests.get(url, timeout=fetcher_config.REQUEST_TIMEOUT)
-                response.raise_for_status()
-
-                with safe_open(filepath, "w", encoding="utf-8") as f:
-                    json.dump(response.json(), f, indent=2)
-
-                results["successful"] += 1
+        if status_callback:
+            status_callback(f"Fetching search data for {len(dates)} dates...")
 
-            except (requests.RequestException, json.JSONDecodeError) as e:
-                error_msg = f"Failed to download {date}: {str(e)}"
-                results["errors"].append(error_msg)
-                results["failed"] += 1
-                logger.warning(error_msg)
+        base_url = self.search_base_url
+        data_dir = self.search_data_dir
+        downloads = [
+            (date, f"{base_url}/{date}.json", data_dir / f"{date}.json")
+            for date in dates
+        ]
+        self._run_downloads(downloads, results, progress_callback, status_callback)
 
         if progress_callback:
             progress_callback(1.0)
@@ -346,63 +519,210 @@ class DataFetcher:
         # Create data directory if it doesn't exist
         self.apps_data_dir.mkdir(parents=True, exist_ok=True)
 
-        total_operations = sum(
-            sum(1 for date in dates if date in server_dates.get(server, set()))
-            for server in self.servers
-        )
+        # Per-server invariants, resolved once rather than per (date, server)
+        server_dirs = {server: self.apps_data_dir / server for server in self.servers}
+        for server_dir in server_dirs.values():
+            server_dir.mkdir(parents=True, exist_ok=True)
+        server_urls = {
+            server: f"{self.apps_base_url}/{server}" for server in self.servers
+        }
+        empty: set[str] = set()
+
+        downloads: list[tuple[str, str, pathlib.Path]] = []
+        for date in dates:
+            filename = f"{date}.json"
+            for server in self.servers:
+                # Only request files a server's index lists, so a lagging
+                # server costs no 404 round trips
+                if date not in server_dates.get(server, empty):
+                    continue
+                downloads.append(
+                    (
+                        f"{server}/{date}",
+                        f"{server_urls[server]}/{filename}",
+                        server_dirs[server] / filename,
+                    )
+                )
+
+        total_operations = len(downloads)
         if total_operations == 0:
             return {
                 "total_files": 0,
                 "successful": 0,
+                "unchanged": 0,
                 "failed": 0,
                 "errors": ["No files available to download"],
             }
         results = {
             "total_files": total_operations,
             "successful": 0,
+            "unchanged": 0,
             "failed": 0,
             "errors": [],
         }
-        op_count = 0
-        batch_size = (
-            fetcher_config.BATCH_SIZE
-        )  # Number of concurrent requests per batch
-        session = requests.Session()
-        for batch_start in range(0, len(dates), batch_size):
-            batch_dates = dates[batch_start : batch_start + batch_size]
-            for date in batch_dates:
-                for server in self.servers:
-                    if date not in server_dates.get(server, set()):
-                        continue
-                    url = f"{self.apps_base_url}/{server}/{date}.json"
-                    server_dir = self.apps_data_dir / server
-                    server_dir.mkdir(parents=True, exist_ok=True)
-                    filepath = server_dir / f"{date}.json"
-                    try:
-                        response = session.get(
-                            url, timeout=fetcher_config.REQUEST_TIMEOUT
-                        )
-                        response.raise_for_status()
-                        with safe_open(filepath, "w", encoding="utf-8") as f:
-                            json.dump(response.json(), f, indent=2)
-                        results["successful"] += 1
-                    except (
-                        requests.RequestException,
-                        json.JSONDecodeError,
-                    ) as e:
-                        error_msg = f"Failed to download {server}/{date}: {str(e)}"
-                        results["errors"].append(error_msg)
-                        results["failed"] += 1
-                        logger.warning(error_msg)
-                    op_count += 1
-                    if progress_callback:
-                        progress_callback(op_count / total_operations)
+        if status_callback:
+            status_callback(f"Fetching {total_operations} app data files...")
+
+        self._run_downloads(downloads, results, progress_callback, status_callback)
+
         if progress_callback:
             progress_callback(1.0)
         if status_callback:
             status_callback("App data fetch complete!")
         return results
 
+    def _run_downloads(
+        self,
+        downloads: list[tuple[str, str, pathlib.Path]],
+        results: dict[str, Any],
+        progress_callback: Callable[[float], None] | None = None,
+        status_callback: Callable[[str], None] | None = None,
+    ) -> None:
+        """
+        Download files concurrently on a bounded thread pool.
+
+        Results are recorded on the calling thread as each download
+        completes, so callbacks never run on a worker thread. Callbacks fire
+        only when overall progress reaches a new whole percent, so a large
+        fetch sends at most 100 UI updates.
+
+        Args:
+            downloads: List of (label, url, filepath) tuples
+            results: Results dictionary to update with successes and failures.
+                Files the server reports as unmodified count as successful
+                and are also tallied under "unchanged".
+            progress_callback: Optional callback for progress updates
+            status_callback: Optional callback for status messages
+        """
+        if not downloads:
+            return
+
+        total = len(downloads)
+        last_percent = 0
+        max_workers = min(fetcher_config.BATCH_SIZE, total)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._download_file, url, filepath): label
+                for label, url, filepath in downloads
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                label = futures[future]
+                try:
+                    if not future.result():
+                        results["unchanged"] += 1
+                    results["successful"] += 1
+                except (requests.RequestException, OSError) as e:
+                    error_msg = f"Failed to download {label}: {str(e)}"
+                    results["errors"].append(error_msg)
+                    results["failed"] += 1
+                    logger.warning(error_msg)
+
+                # Each callback re-renders Streamlit widgets; skip updates
+                # that wouldn't move the progress bar
+                percent = done * 100 // total
+                if percent == last_percent:
+                    continue
+                last_percent = percent
+                if progress_callback:
+                    progress_callback(done / total)
+                if status_callback:
+                    status_callback(f"Finished {label} ({done}/{total})")
+
+        # Persist the validators of the new files once per batch
+        flush_validators()
+
+    def _download_file(self, url: str, filepath: pathlib.Path) -> bool:
+        """
+        Download a single JSON file, failing fast while its host is down.
+
+        Connection errors, timeouts and server errors count against the
+        host's circuit breaker. Once it opens, downloads from that host fail
+        immediately instead of each waiting out the full timeout, until a
+        probe request is let through after CIRCUIT_RESET_TIMEOUT seconds.
+
+        Runs on a worker thread of the download pool.
+
+        Args:
+            url: URL of the file to download
+            filepath: Local path to write the file to
+
+        Returns:
+            True if the file was downloaded, False if the server reported
+            the local copy as unchanged
+
+        Raises:
+            requests.RequestException: If the request fails, the server
+                answers with an HTML page instead of JSON, or the host's
+                circuit is open
+            OSError: If the file cannot be written
+        """
+        host = urlsplit(url).netloc
+        if not self._circuit_breaker.allow(host):
+            raise requests.ConnectionError(f"Circuit open for host {host}")
+
+        try:
+            downloaded = self._fetch_file(url, filepath)
+        except (
+            requests.ConnectionError,
+            requests.Timeout,
+            requests.exceptions.RetryError,
+        ):
+            self._circuit_breaker.record_failure(host)
+            raise
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code >= 500:
+                self._circuit_breaker.record_failure(host)
+            else:
+                # The host answered; only this file is unavailable
+                self._circuit_breaker.record_success(host)
+            raise
+
+        self._circuit_breaker.record_success(host)
+        return downloaded
+
+    def _fetch_file(self, url: str, filepath: pathlib.Path) -> bool:
+        """
+        Fetch a single JSON file, overwriting any existing copy.
+
+        The body is streamed to disk exactly as served, and the request is
+        made conditional on the validators saved for an existing local
+        copy (see etl.http_cache.download_json).
+
+        Args:
+            url: URL of the file to download
+            filepath: Local path to write the file to
+
+        Returns:
+            True if the file was downloaded, False if the server reported
+            the local copy as unchanged
+
+        Raises:
+            requests.RequestException: If the request fails or the server
+                answers with an HTML page instead of JSON
+        """
+        self._rate_limit()
+        return download_json(
+            self.session,
+            url,
+            filepath,
+            fetcher_config.REQUEST_TIMEOUT,
+            fetcher_config.DOWNLOAD_CHUNK_SIZE,
+        )
+
+    def _rate_limit(self) -> None:
+        """
+        Space out request start times across all download threads.
+
+        Each call reserves the next free slot, RATE_LIMIT_INTERVAL seconds
+        after the previous one, and sleeps until that slot is reached.
+        """
+        with self._rate_limit_lock:
+            now = time.monotonic()
+            request_time = max(now, self._next_request_time)
+            self._next_request_time = request_time + fetcher_config.RATE_LIMIT_INTERVAL
+        if request_time > now:
+            time.sleep(request_time - now)
+
     def get_missing_dates(
         self, data_type: str, start_date: str, end_date: str
     ) -> list[str]:
@@ -423,18 +743,19 @@ class DataFetcher:
         start_dt = datetime.strptime(start_date, "%Y-%m-%d")
         end_dt = datetime.strptime(end_date, "%Y-%m-%d")
 
-        # Generate list of all dates in range
-        all_dates: list[str] = []
-        current_date = start_dt
-        while current_date <= end_dt:
-            all_dates.append(current_date.strftime("%Y-%m-%d"))
-            current_date += timedelta(days=1)
-
         # Get locally available dates
         local_dates = set(self.get_local_dates(data_type))
 
-        # Return missing dates
-        return [date for date in all_dates if date not in local_dates]
+        # Walk the range day by day and keep only the missing dates, without
+        # materializing the full range (isoformat is YYYY-MM-DD and much
+        # cheaper than strftime)
+        start_day = start_dt.date()
+        return [
+            day
+            for offset in range((end_dt - start_dt).days + 1)
+            if (day := (start_day + timedelta(days=offset)).isoformat())
+            not in local_dates
+        ]
 
     def check_data_availability(self, data_type: str) -> dict[str, Any]:
         """
@@ -453,6 +774,7 @@ class DataFetcher:
         """
         local_dates = self.get_local_dates(data_type)
         remote_dates = self.get_available_remote_dates(data_type)
+        local_set = set(local_dates)
 
         return {
             "local_count": len(local_dates),
@@ -463,7 +785,8 @@ class DataFetcher:
             "remote_date_range": (remote_dates[0], remote_dates[-1])
             if remote_dates
             else (None, None),
-            "missing_dates": [date for date in remote_dates if date not in local_dates][
-                :10
-            ],  # Show first 10
+            # Show first 10
+            "missing_dates": list(
+                islice((date for date in remote_dates if date not in local_set), 10)
+            ),
         }
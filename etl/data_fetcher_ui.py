@@ -2,22 +2,27 @@
 Data fetching UI components for F-Droid dashboard
 """
 
+import time
 from datetime import datetime, timedelta
 
 import streamlit as st
 
 from etl.data_fetcher import DataFetcher
 
+PROGRESS_REFRESH_INTERVAL = 0.1  # seconds between progress widget redraws
+
+
+@st.cache_resource
+def get_data_fetcher() -> DataFetcher:
+    """Get a cached instance of the data fetcher, shared by all pages and sessions."""
+    return DataFetcher()
+
 
 def show_data_fetcher(data_type: str, key_prefix: str = "") -> bool:
     """Show data fetching interface for search or app data."""
     st.subheader(f"📥 Fetch {data_type.title()} Data")
 
-    # Initialize data fetcher
-    if "data_fetcher" not in st.session_state:
-        st.session_state.data_fetcher = DataFetcher()
-
-    fetcher = st.session_state.data_fetcher
+    fetcher = get_data_fetcher()
 
     # Check current data availability
     with st.expander("📊 Data Availability Status", expanded=False):
@@ -151,14 +156,30 @@ def fetch_data_with_progress(
     """Fetch data with progress feedback."""
     try:
         with st.spinner(f"Fetching {data_type} data..."):
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-
-            def progress_callback(progress: float) -> None:
-                progress_bar.progress(progress)
+            # Progress and status share one widget, redrawn at most every
+            # PROGRESS_REFRESH_INTERVAL seconds, since each redraw is a
+            # round trip to the browser
+            progress_bar = st.progress(0.0)
+            progress = 0.0
+            message = ""
+            shown_at = 0.0
+
+            def show_progress(force: bool = False) -> None:
+                nonlocal shown_at
+                now = time.monotonic()
+                if force or now - shown_at >= PROGRESS_REFRESH_INTERVAL:
+                    shown_at = now
+                    progress_bar.progress(progress, text=message)
+
+            def progress_callback(value: float) -> None:
+                nonlocal progress
+                progress = value
+                show_progress()
 
             def status_callback(msg: str) -> None:
-                status_text.text(msg)
+                nonlocal message
+                message = msg
+                show_progress()
 
             results = fetcher.fetch_date_range(
                 data_type,
@@ -167,6 +188,7 @@ def fetch_data_with_progress(
                 progress_callback=progress_callback,
                 status_callback=status_callback,
             )
+            show_progress(force=True)
 
         # Show results
         st.subheader("📋 Fetch Results")
@@ -182,6 +204,8 @@ def fetch_data_with_progress(
         # Show success/failure breakdown
         if results["successful"] > 0:
             st.success(f"Successfully downloaded {results['successful']} files!")
+            if results.get("unchanged", 0) > 0:
+                st.info(f"{results['unchanged']} files were already up to date")
 
         if results["failed"] > 0:
             st.error(f"Failed to download {results['failed']} files")
@@ -204,10 +228,7 @@ def show_quick_fetch_buttons(data_type: str, key_prefix: str = "") -> bool:
         "within each period."
     )
 
-    if "data_fetcher" not in st.session_state:
-        st.session_state.data_fetcher = DataFetcher()
-
-    fetcher = st.session_state.data_fetcher
+    fetcher = get_data_fetcher()
 
     col1, col2, col3, col4 = st.columns(4)
 
@@ -0,0 +1,80 @@
+"""
+Helpers for the YYYY-MM-DD date strings that name metrics data files.
+"""
+
+import os
+import pathlib
+import re
+from datetime import date
+
+# Validates YYYY-MM-DD strings; far cheaper than datetime.strptime per file.
+# Like datetime, it takes ASCII digits only and rejects year 0000; days 29-31
+# are additionally checked against the month by is_date_string.
+DATE_RE = re.compile(r"(?!0000)\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])", re.ASCII)
+
+JSON_EXT = ".json"
+
+
+def is_date_string(value: str) -> bool:
+    """
+    Check whether a string is a date in YYYY-MM-DD format.
+
+    Args:
+        value: String to check
+
+    Returns:
+        True if the whole string is a valid YYYY-MM-DD calendar date,
+        False otherwise
+    """
+    match = DATE_RE.fullmatch(value)
+    if match is None:
+        return False
+    if int(match.group(2)) <= 28:
+        return True
+
+    # Only the month-end days need a real calendar check
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def date_from_filename(filename: str) -> str | None:
+    """
+    Extract the date from a data file name such as "2024-01-31.json".
+
+    Args:
+        filename: File name, with or without the .json extension
+
+    Returns:
+        The date string in YYYY-MM-DD format, or None if the name is not
+        a dated data file (e.g. "index.json" or "last_submitted_to_cimp.json")
+    """
+    date_str = filename.removesuffix(JSON_EXT)
+    return date_str if is_date_string(date_str) else None
+
+
+def scan_date_files(directory: pathlib.Path) -> list[str]:
+    """
+    List the dates of the YYYY-MM-DD.json files in a directory.
+
+    Uses os.scandir, which yields entry names straight from the directory
+    listing without building a Path object per file.
+
+    Args:
+        directory: Directory to scan
+
+    Returns:
+        Sorted list of date strings; empty if the directory doesn't exist
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(
+                entry.name[: -len(JSON_EXT)]
+                for entry in entries
+                if entry.name.endswith(JSON_EXT)
+                and is_date_string(entry.name[: -len(JSON_EXT)])
+            )
+    except FileNotFoundError:
+        return []
@@ -2,8 +2,14 @@
 F-Droid metadata fetcher for getting real package categories and information.
 """
 
+import json
 import logging
+import os
+import re
+import threading
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from urllib.parse import quote
 
@@ -13,10 +19,35 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from etl.config import fetcher_config, metadata_config
+from etl.http_cache import _tmp_path
 from etl.security import safe_open
 
 logger = logging.getLogger(__name__)
 
+# libyaml's C loader and dumper are several times faster than the pure-Python
+# ones; fall back to those when PyYAML was built without libyaml
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Fallback categories by package name keyword, checked in order: the first
+# category with any of its keywords in the lowercased name wins. Each is one
+# compiled alternation, so a name is scanned once per category in C.
+_CATEGORY_PATTERNS: tuple[tuple[re.Pattern[str], str], ...] = tuple(
+    (re.compile("|".join(map(re.escape, keywords))), category)
+    for keywords, category in (
+        (("fdroid", "f-droid"), "F-Droid Core"),
+        (("newpipe", "tube", "youtube"), "Multimedia"),
+        (("telegram", "chat", "message", "signal", "element", "matrix"), "Internet"),
+        (("launcher", "home", "desktop"), "System"),
+        (("gallery", "photo", "image", "camera"), "Graphics"),
+        (("music", "audio", "player", "sound"), "Multimedia"),
+        (("calculator", "calendar", "note", "task", "todo"), "Office"),
+        (("game", "puzzle", "play"), "Games"),
+        (("browser", "web", "firefox", "chrome"), "Internet"),
+        (("keyboard", "input"), "System"),
+    )
+)
+
 
 class FDroidMetadataFetcher:
     """Fetches F-Droid package metadata from the fdroiddata repository."""
@@ -43,24 +74,100 @@ class FDroidMetadataFetcher:
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
 
-        # Rate limiting
-        self.last_request_time: float = 0
+        # Token bucket rate limiting, shared by the worker threads of bulk
+        # lookups: one token is refilled every min_request_interval seconds,
+        # up to RATE_LIMIT_BURST saved tokens
         self.min_request_interval = fetcher_config.RATE_LIMIT_INTERVAL
+        self._rate_limit_burst = metadata_config.RATE_LIMIT_BURST
+        self._tokens = float(self._rate_limit_burst)
+        self._tokens_updated = time.monotonic()
+        self._rate_limit_lock = threading.Lock()
 
         # Cache for parsed metadata
         self._metadata_cache: dict[str, dict] = {}
 
+        # Packages fdroiddata doesn't have (HTTP 404), mapped to when that was
+        # seen, so they aren't probed again until MISSING_TTL has passed
+        self._missing_path = self.cache_dir / "_missing.json"
+        self._missing_lock = threading.Lock()
+        self._missing: dict[str, float] = self._load_missing()
+        self._missing_dirty = False
+
     def _rate_limit(self) -> None:
         """
         Implement rate limiting to be respectful to GitLab servers.
 
-        Ensures minimum time interval between consecutive requests.
+        Takes a token from a bucket shared by all threads. After an idle
+        period up to RATE_LIMIT_BURST requests start immediately; beyond that
+        requests are spaced min_request_interval seconds apart. A caller
+        that finds the bucket empty reserves a future token under the lock
+        and sleeps outside it, so waiting threads don't block each other.
+        """
+        with self._rate_limit_lock:
+            now = time.monotonic()
+            refilled = (now - self._tokens_updated) / self.min_request_interval
+            self._tokens = min(self._rate_limit_burst, self._tokens + refilled) - 1
+            self._tokens_updated = now
+            wait = -self._tokens * self.min_request_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def _load_missing(self) -> dict[str, float]:
+        """
+        Load the negative cache of packages not found in fdroiddata.
+
+        Returns:
+            Dictionary mapping package_id to the time it was found missing,
+            without expired entries; empty if there is no readable cache
+        """
+        try:
+            with safe_open(self._missing_path, encoding="utf-8") as f:
+                missing = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Error reading missing package cache: {e}")
+            return {}
+
+        if not isinstance(missing, dict):
+            return {}
+        cutoff = time.time() - metadata_config.MISSING_TTL
+        return {
+            package_id: seen
+            for package_id, seen in missing.items()
+            if isinstance(seen, (int, float)) and seen > cutoff
+        }
+
+    def _is_known_missing(self, package_id: str) -> bool:
+        """
+        Check whether a package was recently found missing from fdroiddata.
+
+        Args:
+            package_id: The package ID
+
+        Returns:
+            True if a 404 for the package was recorded within MISSING_TTL
         """
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        self.last_request_time = time.time()
+        seen = self._missing.get(package_id)
+        return seen is not None and time.time() - seen < metadata_config.MISSING_TTL
+
+    def _save_missing(self) -> None:
+        """Write the negative cache to disk if it changed since the last save."""
+        with self._missing_lock:
+            if not self._missing_dirty:
+                return
+            missing = dict(self._missing)
+            self._missing_dirty = False
+
+        tmp_path = _tmp_path(self._missing_path)
+        try:
+            with safe_open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(missing, f)
+            os.replace(tmp_path, self._missing_path)
+        except OSError as e:
+            # Only an optimization; the packages will just be probed again
+            logger.warning(f"Error writing missing package cache: {e}")
+            tmp_path.unlink(missing_ok=True)
 
     def _get_cache_path(self, package_id: str) -> Path:
         """
@@ -94,16 +201,27 @@ class FDroidMetadataFetcher:
 
             if response.status_code == 200:
                 # Parse YAML content
-                metadata = yaml.safe_load(response.text)
+                metadata = yaml.load(response.text, Loader=_YAML_LOADER)
 
                 # Cache the result
                 cache_path = self._get_cache_path(package_id)
                 with safe_open(cache_path, "w", encoding="utf-8") as f:
-                    yaml.dump(metadata, f, default_flow_style=False)
+                    yaml.dump(
+                        metadata, f, Dumper=_YAML_DUMPER, default_flow_style=False
+                    )
+
+                if package_id in self._missing:
+                    with self._missing_lock:
+                        self._missing.pop(package_id, None)
+                        self._missing_dirty = True
 
                 return metadata
             elif response.status_code == 404:
-                # Package not found in fdroiddata - this is normal for some packages
+                # Package not found in fdroiddata - this is normal for some packages.
+                # Remember that, so it isn't requested again on every lookup
+                with self._missing_lock:
+                    self._missing[package_id] = time.time()
+                    self._missing_dirty = True
                 return None
             else:
                 logger.warning(
@@ -133,17 +251,20 @@ class FDroidMetadataFetcher:
         """
         cache_path = self._get_cache_path(package_id)
 
-        if cache_path.exists():
+        # Open directly rather than checking exists() first: a cache miss
+        # costs one failed open instead of a stat, and a hit saves the stat
+        try:
+            with safe_open(cache_path, encoding="utf-8") as f:
+                return yaml.load(f, Loader=_YAML_LOADER)
+        except FileNotFoundError:
+            return None
+        except (yaml.YAMLError, OSError) as e:
+            logger.warning(f"Error reading cached metadata for {package_id}: {e}")
+            # Remove corrupted cache file
             try:
-                with safe_open(cache_path, encoding="utf-8") as f:
-                    return yaml.safe_load(f)
-            except (yaml.YAMLError, OSError) as e:
-                logger.warning(f"Error reading cached metadata for {package_id}: {e}")
-                # Remove corrupted cache file
-                try:
-                    cache_path.unlink()
-                except OSError:
-                    pass
+                cache_path.unlink()
+            except OSError:
+                pass
 
         return None
 
@@ -167,11 +288,14 @@ class FDroidMetadataFetcher:
         # Try cache if enabled
         metadata = None
         if use_cache:
+            if self._is_known_missing(package_id):
+                return None
             metadata = self._load_cached_metadata(package_id)
 
         # Fetch from remote if not cached
         if metadata is None:
             metadata = self._fetch_metadata_from_remote(package_id)
+            self._save_missing()
 
         # Store in memory cache
         if metadata is not None:
@@ -193,7 +317,19 @@ class FDroidMetadataFetcher:
             List of categories, empty if not found
         """
         metadata = self.get_package_metadata(package_id, use_cache)
+        return self._categories_from_metadata(metadata)
+
+    @staticmethod
+    def _categories_from_metadata(metadata: dict | None) -> list[str]:
+        """
+        Extract the categories from package metadata.
+
+        Args:
+            metadata: Parsed package metadata, or None
 
+        Returns:
+            List of categories, empty if there are none
+        """
         if metadata and "Categories" in metadata:
             categories = metadata["Categories"]
             if isinstance(categories, list):
@@ -204,29 +340,101 @@ class FDroidMetadataFetcher:
         return []
 
     def get_bulk_categories(
-        self, package_ids: set[str], use_cache: bool = True
+        self,
+        package_ids: set[str],
+        use_cache: bool = True,
+        progress_callback: Callable[[int, int], None] | None = None,
     ) -> dict[str, list[str]]:
         """
         Get categories for multiple packages efficiently.
 
+        Cached packages are resolved first; the remaining ones are downloaded
+        concurrently on a small thread pool, still subject to the rate limit.
+        Results and progress are recorded on the calling thread.
+
         Args:
             package_ids: Set of package IDs to fetch
             use_cache: Whether to use cached data
+            progress_callback: Optional callback receiving the number of
+                packages resolved so far and the total
 
         Returns:
             Dictionary mapping package_id to list of categories
         """
-        results = {}
-
-        for i, package_id in enumerate(package_ids):
-            categories = self.get_package_categories(package_id, use_cache)
-            results[package_id] = categories
+        categories: dict[str, list[str]] = {}
+        to_fetch: list[str] = []
+
+        for package_id in package_ids:
+            metadata = self._metadata_cache.get(package_id)
+            if metadata is None and use_cache:
+                if self._is_known_missing(package_id):
+                    categories[package_id] = []
+                    continue
+                metadata = self._load_cached_metadata(package_id)
+                if metadata is not None:
+                    self._metadata_cache[package_id] = metadata
+            if metadata is None:
+                to_fetch.append(package_id)
+            else:
+                categories[package_id] = self._categories_from_metadata(metadata)
+
+        total = len(categories) + len(to_fetch)
+        if progress_callback:
+            progress_callback(len(categories), total)
+
+        if to_fetch:
+            max_workers = min(metadata_config.MAX_WORKERS, len(to_fetch))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetch = self._fetch_metadata_from_remote
+                futures = {
+                    executor.submit(fetch, package_id): package_id
+                    for package_id in to_fetch
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    package_id = futures[future]
+                    metadata = future.result()
+                    if metadata is not None:
+                        self._metadata_cache[package_id] = metadata
+                    categories[package_id] = self._categories_from_metadata(metadata)
+                    if progress_callback:
+                        progress_callback(len(categories), total)
+
+                    # Progress indicator for large batches
+                    if done % 50 == 0:
+                        logger.info(
+                            f"Fetched metadata for {done}/{len(to_fetch)} packages…"
+                        )
+
+            self._save_missing()
+
+        return {package_id: categories[package_id] for package_id in package_ids}
+
+    def get_bulk_primary_categories(
+        self,
+        package_ids: set[str],
+        use_cache: bool = True,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> dict[str, str]:
+        """
+        Get the primary category for multiple packages, fetching concurrently.
 
-            # Progress indicator for large batches
-            if i > 0 and i % 50 == 0:
-                logger.info(f"Fetched metadata for {i}/{len(package_ids)} packages…")
+        Args:
+            package_ids: Set of package IDs to fetch
+            use_cache: Whether to use cached data
+            progress_callback: Optional callback receiving the number of
+                packages resolved so far and the total
 
-        return results
+        Returns:
+            Dictionary mapping package_id to its primary category, with the
+            same pattern-based fallback as get_primary_category
+        """
+        bulk = self.get_bulk_categories(package_ids, use_cache, progress_callback)
+        return {
+            package_id: categories[0]
+            if categories
+            else self._categorize_by_pattern(package_id)
+            for package_id, categories in bulk.items()
+        }
 
     def get_primary_category(self, package_id: str, use_cache: bool = True) -> str:
         """
@@ -253,62 +461,48 @@ class FDroidMetadataFetcher:
         This is the same logic as the original function but as a fallback.
         """
         package_lower = package_name.lower()
+        for pattern, category in _CATEGORY_PATTERNS:
+            if pattern.search(package_lower):
+                return category
+        return "Unknown"
+
+    def _cache_entries(self) -> list[os.DirEntry[str]]:
+        """
+        List the cached metadata files.
 
-        if any(word in package_lower for word in ["fdroid", "f-droid"]):
-            return "F-Droid Core"
-        elif any(word in package_lower for word in ["newpipe", "tube", "youtube"]):
-            return "Multimedia"
-        elif any(
-            word in package_lower
-            for word in [
-                "telegram",
-                "chat",
-                "message",
-                "signal",
-                "element",
-                "matrix",
-            ]
-        ):
-            return "Internet"
-        elif any(word in package_lower for word in ["launcher", "home", "desktop"]):
-            return "System"
-        elif any(
-            word in package_lower for word in ["gallery", "photo", "image", "camera"]
-        ):
-            return "Graphics"
-        elif any(
-            word in package_lower for word in ["music", "audio", "player", "sound"]
-        ):
-            return "Multimedia"
-        elif any(
-            word in package_lower
-            for word in ["calculator", "calendar", "note", "task", "todo"]
-        ):
-            return "Office"
-        elif any(word in package_lower for word in ["game", "puzzle", "play"]):
-            return "Games"
-        elif any(
-            word in package_lower for word in ["browser", "web", "firefox", "chrome"]
-        ):
-            return "Internet"
-        elif any(word in package_lower for word in ["keyboard", "input"]):
-            return "System"
-        else:
-            return "Unknown"
+        Uses os.scandir, which yields entries straight from the directory
+        listing without building a Path object per file.
+
+        Returns:
+            Directory entries of the *.yml files in the cache directory;
+            empty if the directory doesn't exist
+        """
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                return [
+                    entry
+                    for entry in entries
+                    if entry.name.endswith(".yml") and entry.is_file()
+                ]
+        except FileNotFoundError:
+            return []
 
     def clear_cache(self) -> None:
         """Clear the metadata cache."""
-        if self.cache_dir.exists():
-            for cache_file in self.cache_dir.glob("*.yml"):
-                cache_file.unlink()
+        for entry in self._cache_entries():
+            os.unlink(entry.path)
         self._metadata_cache.clear()
 
+        with self._missing_lock:
+            self._missing.clear()
+            self._missing_dirty = False
+        self._missing_path.unlink(missing_ok=True)
+
     def get_cache_stats(self) -> dict[str, int]:
         """Get statistics about the cache."""
-        cache_files = (
-            list(self.cache_dir.glob("*.yml")) if self.cache_dir.exists() else []
-        )
-        cache_size_mb = sum(f.stat().st_size for f in cache_files) / (1024 * 1024)
+        cache_files = self._cache_entries()
+        cache_size = sum(entry.stat().st_size for entry in cache_files)
+        cache_size_mb = cache_size / (1024 * 1024)
         return {
             "cached_packages": len(cache_files),
             "memory_cache_size": len(self._metadata_cache),
@@ -3,14 +3,21 @@ Download app metrics data from F-Droid HTTP servers based on date range
 """
 
 import argparse
-import json
 import logging
 import pathlib
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 
-import requests as re
-
-from etl.security import safe_open
+from etl.config import fetcher_config
+from etl.dates import date_from_filename
+from etl.http_cache import (
+    CACHE_DIR,
+    download_json,
+    flush_validators,
+    get_json_cached,
+    shared_session,
+)
 
 BASE_URL = "https://fdroid.gitlab.io/metrics"
 SERVERS = [
@@ -22,6 +29,7 @@ SERVERS = [
 ]
 RAW_DATA_DIR = pathlib.Path(__file__).parent / "raw"
 SUB_DATA_DIR = RAW_DATA_DIR / "apps"
+INDEX_CACHE_DIR = CACHE_DIR / "apps"
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +38,12 @@ def fetch_index(server: str) -> list[str]:
     """Fetch and return the index of available data files for a server."""
     logger.info(f"Fetching index for {server}...")
     index_url = f"{BASE_URL}/{server}/index.json"
-    response = re.get(index_url)
-    response.raise_for_status()
-    index = response.json()
+    index = get_json_cached(
+        shared_session(),
+        index_url,
+        INDEX_CACHE_DIR / server / "index.json",
+        fetcher_config.REQUEST_TIMEOUT,
+    )
     logger.info(f"Found {len(index)} available files for {server}")
     return index
 
@@ -44,18 +55,18 @@ def filter_files_for_date_range(
 
     Note: Each date file represents cumulative data since the previous date (usually weekly).
     """
+    # YYYY-MM-DD strings order like the dates they name, so compare the
+    # file names' dates directly instead of parsing each one
+    start_key = start_date.date().isoformat()
+    end_key = end_date.date().isoformat()
+
     date_files = []
     for filename in index:
-        try:
-            # Parse date from filename (format: YYYY-MM-DD.json)
-            date_str = filename.replace(".json", "")
-            file_date = datetime.strptime(date_str, "%Y-%m-%d")
-
-            if start_date <= file_date <= end_date:
-                date_files.append(filename)
-        except ValueError:
-            # Skip files that don't match the expected date format
-            continue
+        # Skips files that don't match the expected YYYY-MM-DD.json format
+        # (e.g. last_submitted_to_cimp.json)
+        date_str = date_from_filename(filename)
+        if date_str is not None and start_key <= date_str <= end_key:
+            date_files.append(filename)
 
     return sorted(date_files)
 
@@ -69,13 +80,20 @@ def download_file(server: str, filename: str) -> bool:
 
     try:
         logger.info(f"Downloading {server}/{filename}...")
-        response = re.get(url)
-        response.raise_for_status()
-
-        with safe_open(filepath, "w", encoding="utf-8") as f:
-            json.dump(response.json(), f, indent=2)
+        # Conditional on the validators saved with the local copy, so an
+        # unchanged file is answered with a 304 and left as is
+        downloaded = download_json(
+            shared_session(),
+            url,
+            filepath,
+            fetcher_config.REQUEST_TIMEOUT,
+            fetcher_config.DOWNLOAD_CHUNK_SIZE,
+        )
 
-        logger.info(f"✓ {server}/{filename} downloaded successfully")
+        if downloaded:
+            logger.info(f"✓ {server}/{filename} downloaded successfully")
+        else:
+            logger.info(f"✓ {server}/{filename} is already up to date")
         return True
     except Exception as e:
         logger.error(f"✗ Failed to download {server}/{filename}: {e}")
@@ -94,17 +112,23 @@ def download_date_range_data(start_date: datetime, end_date: datetime) -> None:
     # Create data directory if it doesn't exist
     SUB_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    total_successful = 0
-    total_failed = 0
-
-    for server in SERVERS:
-        logger.info("=" * 50)
-        logger.info(f"Processing {server}")
-        logger.info("=" * 50)
-
-        try:
-            # Fetch index for this server
-            index = fetch_index(server)
+    successful: Counter[str] = Counter()
+    failed: Counter[str] = Counter()
+
+    # Index lookups and downloads are network-bound, so the servers' indexes
+    # are fetched together and all files share one pool of download threads
+    with ThreadPoolExecutor(max_workers=fetcher_config.BATCH_SIZE) as executor:
+        index_futures = {
+            server: executor.submit(fetch_index, server) for server in SERVERS
+        }
+
+        downloads: list[tuple[str, Future[bool]]] = []
+        for server, index_future in index_futures.items():
+            try:
+                index = index_future.result()
+            except Exception as e:
+                logger.error(f"Failed to process {server}: {e}")
+                continue
 
             # Filter files for the specified date range
             date_files = filter_files_for_date_range(index, start_date, end_date)
@@ -115,28 +139,29 @@ def download_date_range_data(start_date: datetime, end_date: datetime) -> None:
                 )
                 continue
 
-            # Download files for this server
             logger.info(f"Downloading {len(date_files)} files for {server}...")
-            successful = 0
-            failed = 0
-
-            for filename in date_files:
-                if download_file(server, filename):
-                    successful += 1
-                else:
-                    failed += 1
+            downloads.extend(
+                (server, executor.submit(download_file, server, filename))
+                for filename in date_files
+            )
+
+        for server, download in downloads:
+            if download.result():
+                successful[server] += 1
+            else:
+                failed[server] += 1
+    flush_validators()
 
-            logger.info(f"{server} download complete:")
-            logger.info(f"✓ {successful} files downloaded successfully")
-            if failed > 0:
-                logger.warning(f"✗ {failed} files failed to download")
-
-            total_successful += successful
-            total_failed += failed
-
-        except Exception as e:
-            logger.error(f"Failed to process {server}: {e}")
+    for server in SERVERS:
+        if server not in successful and server not in failed:
             continue
+        logger.info(f"{server} download complete:")
+        logger.info(f"✓ {successful[server]} files downloaded successfully")
+        if failed[server] > 0:
+            logger.warning(f"✗ {failed[server]} files failed to download")
+
+    total_successful = successful.total()
+    total_failed = failed.total()
 
     logger.info("=" * 50)
     logger.info("OVERALL SUMMARY")
@@ -3,19 +3,26 @@ Read the index and download data from the FDroid API based on date range
 """
 
 import argparse
-import json
 import logging
 import pathlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
-import requests as re
-
-from etl.security import safe_open
+from etl.config import fetcher_config
+from etl.dates import date_from_filename
+from etl.http_cache import (
+    CACHE_DIR,
+    download_json,
+    flush_validators,
+    get_json_cached,
+    shared_session,
+)
 
 BASE_URL = "https://fdroid.gitlab.io/metrics/search.f-droid.org"
 INDEX_URL = f"{BASE_URL}/index.json"
 RAW_DATA_DIR = pathlib.Path(__file__).parent / "raw"
 SUB_DATA_DIR = RAW_DATA_DIR / "search"
+INDEX_CACHE_DIR = CACHE_DIR / "search"
 
 logger = logging.getLogger(__name__)
 
@@ -23,9 +30,12 @@ logger = logging.getLogger(__name__)
 def fetch_index() -> list[str]:
     """Fetch and return the index of available data files."""
     logger.info("Fetching index...")
-    response = re.get(INDEX_URL)
-    response.raise_for_status()
-    index = response.json()
+    index = get_json_cached(
+        shared_session(),
+        INDEX_URL,
+        INDEX_CACHE_DIR / "index.json",
+        fetcher_config.REQUEST_TIMEOUT,
+    )
     logger.info(f"Found {len(index)} available files")
     return index
 
@@ -37,21 +47,18 @@ def filter_files_for_date_range(
 
     Note: Each date file represents cumulative data since the previous date (usually weekly).
     """
+    # YYYY-MM-DD strings order like the dates they name, so compare the
+    # file names' dates directly instead of parsing each one
+    start_key = start_date.date().isoformat()
+    end_key = end_date.date().isoformat()
+
     date_files = []
     for filename in index:
-        if filename == "last_submitted_to_cimp.json":
-            continue
-
-        try:
-            # Parse date from filename (format: YYYY-MM-DD.json)
-            date_str = filename.replace(".json", "")
-            file_date = datetime.strptime(date_str, "%Y-%m-%d")
-
-            if start_date <= file_date <= end_date:
-                date_files.append(filename)
-        except ValueError:
-            # Skip files that don't match the expected date format
-            continue
+        # Skips files that don't match the expected YYYY-MM-DD.json format
+        # (e.g. last_submitted_to_cimp.json)
+        date_str = date_from_filename(filename)
+        if date_str is not None and start_key <= date_str <= end_key:
+            date_files.append(filename)
 
     logger.info(
         f"Found {len(date_files)} files for date range {start_date.date()} to {end_date.date()}"
@@ -66,13 +73,20 @@ def download_file(filename: str) -> bool:
 
     try:
         logger.info(f"Downloading {filename}...")
-        response = re.get(url)
-        response.raise_for_status()
-
-        with safe_open(filepath, "w", encoding="utf-8") as f:
-            json.dump(response.json(), f, indent=2)
+        # Conditional on the validators saved with the local copy, so an
+        # unchanged file is answered with a 304 and left as is
+        downloaded = download_json(
+            shared_session(),
+            url,
+            filepath,
+            fetcher_config.REQUEST_TIMEOUT,
+            fetcher_config.DOWNLOAD_CHUNK_SIZE,
+        )
 
-        logger.info(f"✓ {filename} downloaded successfully")
+        if downloaded:
+            logger.info(f"✓ {filename} downloaded successfully")
+        else:
+            logger.info(f"✓ {filename} is already up to date")
         return True
     except Exception as e:
         logger.error(f"✗ Failed to download {filename}: {e}")
@@ -107,14 +121,12 @@ def download_date_range_data(start_date: datetime, end_date: datetime) -> None:
     logger.info(
         f"Downloading {len(date_files)} files for date range {start_date.date()} to {end_date.date()}..."
     )
-    successful = 0
-    failed = 0
-
-    for filename in date_files:
-        if download_file(filename):
-            successful += 1
-        else:
-            failed += 1
+    # Downloads are network-bound, so run them on a pool of threads
+    with ThreadPoolExecutor(max_workers=fetcher_config.BATCH_SIZE) as executor:
+        outcomes = list(executor.map(download_file, date_files))
+    flush_validators()
+    successful = sum(outcomes)
+    failed = len(outcomes) - successful
 
     logger.info("Download complete:")
     logger.info(f"✓ {successful} files downloaded successfully")
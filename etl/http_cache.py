@@ -0,0 +1,387 @@
+"""
+JSON downloads cached on disk and revalidated with HTTP conditional requests.
+"""
+
+import atexit
+import json
+import logging
+import os
+import pathlib
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from etl.config import fetcher_config
+from etl.security import safe_open
+
+logger = logging.getLogger(__name__)
+
+# Cached documents such as index files, kept apart from the raw data
+# directories so those only ever contain dated data files
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / "cache" / "http"
+
+# ETag / Last-Modified values of every cached or downloaded file, in one
+# map keyed by path instead of a sidecar file next to each data file
+VALIDATORS_PATH = CACHE_DIR / "validators.json"
+
+
+def create_session() -> requests.Session:
+    """
+    Create a pooled HTTP session for the download scripts.
+
+    Keep-alive connections are reused across requests, up to BATCH_SIZE per
+    host so every download thread can hold one. Transient failures are
+    retried with jittered exponential backoff, honouring Retry-After.
+
+    Returns:
+        Configured requests session
+    """
+    session = requests.Session()
+    session.headers["User-Agent"] = fetcher_config.USER_AGENT
+    retry_strategy = Retry(
+        total=fetcher_config.RETRY_TOTAL,
+        status_forcelist=fetcher_config.STATUS_FORCELIST,
+        backoff_factor=fetcher_config.RETRY_BACKOFF_FACTOR,
+        backoff_jitter=fetcher_config.RETRY_BACKOFF_JITTER,
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_maxsize=fetcher_config.BATCH_SIZE, max_retries=retry_strategy
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def shared_session() -> requests.Session:
+    """
+    Get the pooled session shared by the download scripts' threads.
+
+    It is created on first use rather than at import, so modules that only
+    import the scripts' constants open no connection pool, and it is closed
+    at interpreter exit.
+
+    Returns:
+        The shared requests session
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+            atexit.register(_shared_session.close)
+        return _shared_session
+
+
+def get_json_cached(
+    session: requests.Session, url: str, cache_path: pathlib.Path, timeout: float
+) -> list | dict:
+    """
+    Fetch a JSON document, reusing a cached copy the server reports unchanged.
+
+    The response body is saved to cache_path, and its ETag / Last-Modified
+    values are saved to the validator store, which is flushed to disk before
+    returning. Later calls send them as If-None-Match / If-Modified-Since, so
+    an unchanged document costs a 304 with no body.
+
+    Args:
+        session: HTTP session to send the request with
+        url: URL of the JSON document
+        cache_path: Local file to cache the document in
+        timeout: Request timeout in seconds
+
+    Returns:
+        The parsed JSON document
+
+    Raises:
+        requests.RequestException: If the request fails
+        ValueError: If the document is not valid JSON
+    """
+    headers = _load_validators(cache_path)
+
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and headers:
+        try:
+            with safe_open(cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            # The cached copy is gone or damaged; fetch it again in full
+            logger.warning(f"Cached copy of {url} is unreadable, refetching: {e}")
+            _validators.discard(cache_path)
+            response = session.get(url, timeout=timeout)
+
+    response.raise_for_status()
+    document = response.json()
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        _validators.discard(cache_path)
+        tmp_path = _tmp_path(cache_path)
+        with safe_open(tmp_path, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp_path, cache_path)
+        _save_validators(response, cache_path)
+        flush_validators()
+    except OSError as e:
+        # Caching is an optimization; the fetched document is still usable
+        logger.warning(f"Could not cache {url}: {e}")
+
+    return document
+
+
+def download_json(
+    session: requests.Session,
+    url: str,
+    filepath: pathlib.Path,
+    timeout: float,
+    chunk_size: int,
+) -> bool:
+    """
+    Download a JSON file, overwriting any existing copy.
+
+    The body is streamed to disk in chunks exactly as served, without being
+    parsed or held in memory as a whole. It is written to a temporary file
+    that replaces the local copy only once complete, so readers never see a
+    partial file. If a local copy exists, the request is made conditional on
+    the ETag / Last-Modified values saved for it in the validator store, so
+    an unchanged file costs no body transfer. New values are only kept in
+    memory; callers downloading a batch call flush_validators() at its end.
+
+    Args:
+        session: HTTP session to send the request with
+        url: URL of the file to download
+        filepath: Local path to write the file to
+        timeout: Request timeout in seconds
+        chunk_size: Bytes per streamed write
+
+    Returns:
+        True if the file was downloaded, False if the server reported the
+        local copy as unchanged
+
+    Raises:
+        requests.RequestException: If the request fails or the server answers
+            with an HTML page instead of JSON
+    """
+    headers = _load_validators(filepath)
+
+    with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304 and headers:
+            return False
+        response.raise_for_status()
+
+        # Cheap sanity check in place of parsing the body: error and
+        # captive-portal pages come back as HTML with a 200 status
+        content_type = response.headers.get("Content-Type", "")
+        if content_type.startswith("text/html"):
+            raise requests.exceptions.InvalidJSONError(
+                f"Expected JSON but got {content_type}", response=response
+            )
+
+        # Drop the old validators first, so they can never end up paired
+        # with a different copy of the file
+        _validators.discard(filepath)
+        tmp_path = _tmp_path(filepath)
+        try:
+            with safe_open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    _save_validators(response, filepath)
+    return True
+
+
+def flush_validators() -> None:
+    """
+    Write the validator store to disk if it changed since the last flush.
+
+    Also runs at interpreter exit, so validators of a batch that was cut
+    short are not lost.
+    """
+    _validators.flush()
+
+
+class _ValidatorStore:
+    """Thread-safe map of file paths to their ETag / Last-Modified values."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            path: JSON file the map is loaded from and flushed to
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, str | None]] | None = None
+        self._dirty = False
+
+    @staticmethod
+    def _key(filepath: pathlib.Path) -> str:
+        """
+        Get the store key of a file: its path relative to the project root.
+
+        Args:
+            filepath: Cached or downloaded file
+
+        Returns:
+            POSIX-style relative path, or the absolute path for files
+            outside the project
+        """
+        # abspath only normalizes the string; resolve() would stat every
+        # path component on each lookup
+        absolute = pathlib.Path(os.path.abspath(filepath))
+        try:
+            return absolute.relative_to(_PROJECT_ROOT_ABS).as_posix()
+        except ValueError:
+            return absolute.as_posix()
+
+    def _load(self) -> dict[str, dict[str, str | None]]:
+        """
+        Get the map, reading it from disk on first use.
+
+        Must be called with the lock held.
+
+        Returns:
+            The in-memory map
+        """
+        if self._entries is None:
+            try:
+                with safe_open(self.path, encoding="utf-8") as f:
+                    entries = json.load(f)
+            except FileNotFoundError:
+                entries = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Error reading download validators: {e}")
+                entries = {}
+            self._entries = entries if isinstance(entries, dict) else {}
+        return self._entries
+
+    def get(self, filepath: pathlib.Path) -> dict[str, str | None] | None:
+        """
+        Get the validators saved for a file.
+
+        Args:
+            filepath: Cached or downloaded file
+
+        Returns:
+            Dictionary with "etag" and "last_modified" keys, or None
+        """
+        key = self._key(filepath)
+        with self._lock:
+            return self._load().get(key)
+
+    def set(self, filepath: pathlib.Path, validators: dict[str, str | None]) -> None:
+        """
+        Save the validators of a file.
+
+        Args:
+            filepath: Cached or downloaded file
+            validators: Dictionary with "etag" and "last_modified" keys
+        """
+        key = self._key(filepath)
+        with self._lock:
+            self._load()[key] = validators
+            self._dirty = True
+
+    def discard(self, filepath: pathlib.Path) -> None:
+        """
+        Forget the validators of a file, if any are saved.
+
+        Args:
+            filepath: Cached or downloaded file
+        """
+        key = self._key(filepath)
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._dirty = True
+
+    def flush(self) -> None:
+        """Write the map to disk if it changed since the last flush."""
+        # Writing under the lock keeps an older snapshot from replacing a
+        # newer one when two threads flush at once
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = _tmp_path(self.path)
+                with safe_open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                # Only an optimization; the files will just be downloaded again
+                logger.warning(f"Error writing download validators: {e}")
+                return
+            self._dirty = False
+
+
+_PROJECT_ROOT_ABS = pathlib.Path(os.path.abspath(PROJECT_ROOT))
+_validators = _ValidatorStore(VALIDATORS_PATH)
+atexit.register(flush_validators)
+
+_shared_session: requests.Session | None = None
+_shared_session_lock = threading.Lock()
+
+
+def _tmp_path(path: pathlib.Path) -> pathlib.Path:
+    """
+    Get a temporary file name to write a new copy of a file under.
+
+    The name is unique to the writing process and thread, so concurrent
+    downloads of the same file never write to the same temporary file.
+
+    Args:
+        path: File that will be replaced
+
+    Returns:
+        Path in the same directory, so the final os.replace is atomic
+    """
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _save_validators(response: requests.Response, filepath: pathlib.Path) -> None:
+    """
+    Save a response's ETag / Last-Modified values, if it has any.
+
+    Args:
+        response: Response the local copy was written from
+        filepath: Local copy the values belong to
+    """
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    if validators["etag"] or validators["last_modified"]:
+        _validators.set(filepath, validators)
+
+
+def _load_validators(filepath: pathlib.Path) -> dict[str, str]:
+    """
+    Build conditional request headers for a local copy of a file.
+
+    Args:
+        filepath: Cached or downloaded file
+
+    Returns:
+        If-None-Match / If-Modified-Since headers, or an empty dictionary
+        if there is no local copy or no usable validators
+    """
+    # Look the validators up first: most files without any need no
+    # syscall, and the file is only stat'ed when validators exist
+    validators = _validators.get(filepath)
+    if not validators or not filepath.exists():
+        return {}
+
+    headers: dict[str, str] = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
@@ -38,7 +38,8 @@ def _load_yaml(path: pathlib.Path) -> dict:
     try:
         import yaml
 
-        return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        return yaml.load(path.read_text(encoding="utf-8"), Loader=loader) or {}
     except ImportError:
         return {}
 
@@ -0,0 +1,140 @@
+"""
+Tests for the data fetcher's circuit breaker and rate limiter.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from etl.config import fetcher_config
+from etl.data_fetcher import CircuitBreaker, DataFetcher
+
+
+class FakeClock:
+    """Stand-in for the time module whose clock only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """Replace the time module used by etl.data_fetcher with a fake clock."""
+    fake = FakeClock()
+    with patch("etl.data_fetcher.time", fake):
+        yield fake
+
+
+class TestCircuitBreaker:
+    """Test the closed -> open -> half-open state machine."""
+
+    HOST = "http01.fdroid.net"
+
+    def test_stays_closed_below_threshold(self, clock):
+        """Failures below the threshold should not open the circuit."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+        for _ in range(2):
+            breaker.record_failure(self.HOST)
+        assert breaker.allow(self.HOST)
+
+    def test_opens_at_threshold(self, clock):
+        """The circuit should open at the threshold, for that host only."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+        for _ in range(3):
+            breaker.record_failure(self.HOST)
+        assert not breaker.allow(self.HOST)
+        assert breaker.allow("http02.fdroid.net")
+
+    def test_success_resets_failure_count(self, clock):
+        """A success should reset the count of consecutive failures."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+        breaker.record_failure(self.HOST)
+        breaker.record_failure(self.HOST)
+        breaker.record_success(self.HOST)
+        breaker.record_failure(self.HOST)
+        breaker.record_failure(self.HOST)
+        assert breaker.allow(self.HOST)
+
+    def test_half_open_after_reset_timeout(self, clock):
+        """One probe should be let through once the reset timeout has passed."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0)
+        breaker.record_failure(self.HOST)
+        breaker.record_failure(self.HOST)
+
+        clock.advance(29.9)
+        assert not breaker.allow(self.HOST)
+
+        clock.advance(0.1)
+        assert breaker.allow(self.HOST)
+        # Only the probe goes through; others wait for its outcome
+        assert not breaker.allow(self.HOST)
+
+    def test_half_open_success_closes(self, clock):
+        """A successful probe should close the circuit."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0)
+        breaker.record_failure(self.HOST)
+        breaker.record_failure(self.HOST)
+        clock.advance(30.0)
+        assert breaker.allow(self.HOST)
+
+        breaker.record_success(self.HOST)
+        assert breaker.allow(self.HOST)
+        assert breaker.allow(self.HOST)
+        # Closed again, so a single failure doesn't reopen it
+        breaker.record_failure(self.HOST)
+        assert breaker.allow(self.HOST)
+
+    def test_half_open_failure_reopens(self, clock):
+        """A failed probe should reopen the circuit for a full timeout."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0)
+        breaker.record_failure(self.HOST)
+        breaker.record_failure(self.HOST)
+        clock.advance(30.0)
+        assert breaker.allow(self.HOST)
+
+        breaker.record_failure(self.HOST)
+        assert not breaker.allow(self.HOST)
+        clock.advance(29.9)
+        assert not breaker.allow(self.HOST)
+        clock.advance(0.1)
+        assert breaker.allow(self.HOST)
+
+
+class TestRateLimit:
+    """Test the request spacing shared by the download threads."""
+
+    def test_back_to_back_requests_are_spaced(self, clock):
+        """Requests made at once should start RATE_LIMIT_INTERVAL apart."""
+        interval = fetcher_config.RATE_LIMIT_INTERVAL
+        with DataFetcher() as fetcher:
+            for _ in range(4):
+                fetcher._rate_limit()
+        assert clock.sleeps == pytest.approx([interval] * 3)
+
+    def test_idle_fetcher_does_not_wait(self, clock):
+        """A request after an idle period should start immediately."""
+        with DataFetcher() as fetcher:
+            fetcher._rate_limit()
+            clock.advance(fetcher_config.RATE_LIMIT_INTERVAL * 2)
+            fetcher._rate_limit()
+        assert clock.sleeps == []
+
+    def test_reserved_slots_account_for_elapsed_time(self, clock):
+        """Only the remainder of an interval should be waited out."""
+        interval = fetcher_config.RATE_LIMIT_INTERVAL
+        with DataFetcher() as fetcher:
+            fetcher._rate_limit()
+            clock.advance(interval / 4)
+            fetcher._rate_limit()
+        assert clock.sleeps == pytest.approx([interval * 3 / 4])
@@ -0,0 +1,159 @@
+"""
+Tests for the conditional, atomic JSON downloads in etl.http_cache.
+"""
+
+import pathlib
+import tempfile
+from collections.abc import Iterator
+from typing import Self
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from etl import http_cache
+from etl.security import _get_project_root
+
+URL = "https://example.org/metrics/2024-01-01.json"
+
+
+class StubResponse:
+    """Minimal stand-in for a streamed requests.Response."""
+
+    def __init__(
+        self,
+        status_code: int,
+        body: bytes = b"",
+        headers: dict[str, str] | None = None,
+        fail_after_first_chunk: bool = False,
+    ) -> None:
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.fail_after_first_chunk = fail_after_first_chunk
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}", response=self)
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start : start + chunk_size]
+            if self.fail_after_first_chunk:
+                raise requests.exceptions.ChunkedEncodingError("Connection broken")
+
+
+class StubSession:
+    """Session that answers every request with a fixed response."""
+
+    def __init__(self, response: StubResponse) -> None:
+        self.response = response
+        self.requests: list[dict[str, str]] = []
+
+    def get(self, url: str, headers: dict[str, str] | None = None, **kwargs):
+        self.requests.append(headers or {})
+        return self.response
+
+
+@pytest.fixture
+def data_dir():
+    """A scratch directory inside cache/, with its own validator store."""
+    cache_root = _get_project_root() / "cache"
+    cache_root.mkdir(exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=cache_root) as tmp:
+        directory = pathlib.Path(tmp)
+        store = http_cache._ValidatorStore(directory / "validators.json")
+        with patch.object(http_cache, "_validators", store):
+            yield directory
+
+
+def download(session: StubSession, filepath: pathlib.Path) -> bool:
+    return http_cache.download_json(session, URL, filepath, 30, 4)
+
+
+def test_download_writes_body_and_validators(data_dir):
+    """A 200 response should be written as served and its ETag remembered."""
+    filepath = data_dir / "2024-01-01.json"
+    body = b'{"hits": 12, "paths": {}}'
+    session = StubSession(
+        StubResponse(200, body, {"Content-Type": "application/json", "ETag": '"v1"'})
+    )
+
+    assert download(session, filepath)
+    assert filepath.read_bytes() == body
+    assert session.requests == [{}]
+
+    # The next request is conditional on the saved ETag
+    session.response = StubResponse(304)
+    assert not download(session, filepath)
+    assert session.requests[1] == {"If-None-Match": '"v1"'}
+
+
+def test_not_modified_leaves_file_untouched(data_dir):
+    """A 304 response should leave the local copy as it was."""
+    filepath = data_dir / "2024-01-01.json"
+    filepath.write_bytes(b'{"hits": 1}')
+    mtime_ns = filepath.stat().st_mtime_ns
+    http_cache._validators.set(
+        filepath, {"etag": None, "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    )
+    session = StubSession(StubResponse(304))
+
+    assert not download(session, filepath)
+    assert session.requests == [{"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}]
+    assert filepath.read_bytes() == b'{"hits": 1}'
+    assert filepath.stat().st_mtime_ns == mtime_ns
+
+
+def test_validators_ignored_without_local_copy(data_dir):
+    """Saved validators should not be sent when the file itself is gone."""
+    filepath = data_dir / "2024-01-01.json"
+    http_cache._validators.set(filepath, {"etag": '"v1"', "last_modified": None})
+    session = StubSession(
+        StubResponse(200, b"{}", {"Content-Type": "application/json"})
+    )
+
+    assert download(session, filepath)
+    assert session.requests == [{}]
+
+
+def test_html_response_rejected(data_dir):
+    """An HTML page served with a 200 status should not be written."""
+    filepath = data_dir / "2024-01-01.json"
+    session = StubSession(
+        StubResponse(200, b"<html>Sign in</html>", {"Content-Type": "text/html"})
+    )
+
+    with pytest.raises(requests.exceptions.InvalidJSONError):
+        download(session, filepath)
+    assert list(data_dir.iterdir()) == []
+
+
+def test_failed_write_leaves_no_partial_file(data_dir):
+    """A body cut off mid-stream should leave neither a partial nor a temp file."""
+    filepath = data_dir / "2024-01-01.json"
+    session = StubSession(
+        StubResponse(
+            200,
+            b'{"hits": 12, "paths": {}}',
+            {"Content-Type": "application/json", "ETag": '"v2"'},
+            fail_after_first_chunk=True,
+        )
+    )
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download(session, filepath)
+    assert list(data_dir.iterdir()) == []
+
+    # An existing copy is kept as it was
+    filepath.write_bytes(b'{"hits": 1}')
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download(session, filepath)
+    assert filepath.read_bytes() == b'{"hits": 1}'
+    assert sorted(p.name for p in data_dir.iterdir()) == ["2024-01-01.json"]
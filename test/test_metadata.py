@@ -4,8 +4,16 @@ Test script for F-Droid metadata fetcher
 """
 
 import logging
+import pathlib
+import tempfile
+from unittest.mock import patch
 
+import pytest
+import yaml
+
+from etl.config import fetcher_config, metadata_config
 from etl.fdroid_metadata import FDroidMetadataFetcher
+from etl.security import _get_project_root
 
 
 def test_metadata_fetcher():
@@ -52,6 +60,183 @@ def test_metadata_fetcher():
         logging.info(f"  {key}: {value}")
 
 
+class FakeTime:
+    """Stand-in for the time module whose clocks only move when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class StubResponse:
+    """Minimal stand-in for a requests.Response."""
+
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+
+
+class StubSession:
+    """Session serving metadata for a fixed set of packages, 404 for the rest."""
+
+    def __init__(self, known: dict[str, list[str]]) -> None:
+        self.known = known
+        self.requested: list[str] = []
+
+    def get(self, url: str, timeout: float) -> StubResponse:
+        package_id = url.rsplit("/", 1)[1].removesuffix(".yml")
+        self.requested.append(package_id)
+        if package_id not in self.known:
+            return StubResponse(404)
+        return StubResponse(200, yaml.safe_dump({"Categories": self.known[package_id]}))
+
+
+@pytest.fixture
+def clock():
+    """Replace the time module used by etl.fdroid_metadata with a fake one."""
+    fake = FakeTime()
+    with patch("etl.fdroid_metadata.time", fake):
+        yield fake
+
+
+@pytest.fixture
+def cache_dir():
+    """A scratch metadata cache directory inside cache/."""
+    cache_root = _get_project_root() / "cache"
+    cache_root.mkdir(exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=cache_root) as tmp:
+        yield pathlib.Path(tmp)
+
+
+def make_fetcher(
+    cache_dir: pathlib.Path, session: StubSession
+) -> FDroidMetadataFetcher:
+    fetcher = FDroidMetadataFetcher(cache_dir=str(cache_dir))
+    fetcher.session = session
+    return fetcher
+
+
+def test_missing_package_not_probed_again(clock, cache_dir):
+    """A 404 should be remembered, also by later fetcher instances."""
+    session = StubSession({})
+    fetcher = make_fetcher(cache_dir, session)
+    assert fetcher.get_package_metadata("org.example.gone") is None
+    assert fetcher.get_package_metadata("org.example.gone") is None
+    assert session.requested == ["org.example.gone"]
+    assert (cache_dir / "_missing.json").exists()
+
+    other = make_fetcher(cache_dir, session)
+    assert other.get_bulk_categories({"org.example.gone"}) == {"org.example.gone": []}
+    assert session.requested == ["org.example.gone"]
+    # The negative cache is not counted as cached metadata
+    assert other.get_cache_stats()["cached_packages"] == 0
+
+
+def test_missing_package_probed_again_after_ttl(clock, cache_dir):
+    """Once MISSING_TTL has passed, a missing package should be probed again."""
+    session = StubSession({})
+    fetcher = make_fetcher(cache_dir, session)
+    fetcher.get_package_metadata("org.example.gone")
+
+    clock.now += metadata_config.MISSING_TTL - 1
+    fetcher.get_package_metadata("org.example.gone")
+    assert session.requested == ["org.example.gone"]
+
+    clock.now += 1
+    fetcher.get_package_metadata("org.example.gone")
+    assert session.requested == ["org.example.gone"] * 2
+
+    # Expired entries are dropped when the cache is loaded
+    clock.now += metadata_config.MISSING_TTL
+    make_fetcher(cache_dir, session).get_package_metadata("org.example.gone")
+    assert session.requested == ["org.example.gone"] * 3
+
+
+def test_package_that_appears_later_is_not_masked(clock, cache_dir):
+    """A package added to fdroiddata after a 404 should be found again."""
+    session = StubSession({})
+    fetcher = make_fetcher(cache_dir, session)
+    assert fetcher.get_package_categories("org.example.new") == []
+
+    session.known["org.example.new"] = ["Games"]
+    # Bypassing the cache probes right away, and the 200 clears the entry
+    assert fetcher.get_package_categories("org.example.new", use_cache=False) == [
+        "Games"
+    ]
+    other = make_fetcher(cache_dir, session)
+    assert other.get_package_categories("org.example.new") == ["Games"]
+
+    # Without bypassing, the package shows up once the entry expires
+    session.known.clear()
+    fetcher = make_fetcher(cache_dir, session)
+    fetcher.get_package_metadata("org.example.later")
+    session.known["org.example.later"] = ["Internet"]
+    clock.now += metadata_config.MISSING_TTL
+    assert fetcher.get_package_categories("org.example.later") == ["Internet"]
+
+
+def test_bulk_primary_categories_match_per_package_loop(clock, cache_dir):
+    """The bulk lookup should match calling get_primary_category per package."""
+    known = {
+        "org.example.one": ["Multimedia", "Internet"],
+        "org.example.two": ["Office"],
+        "org.example.empty": [],
+    }
+    package_ids = {
+        *known,
+        "org.example.musicplayer",
+        "org.example.chatlauncher",
+        "org.example.nothing",
+    }
+    # Warm the disk cache for part of the set
+    make_fetcher(cache_dir, StubSession(known)).get_package_metadata("org.example.one")
+
+    expected = {
+        package_id: make_fetcher(cache_dir, StubSession(known)).get_primary_category(
+            package_id
+        )
+        for package_id in package_ids
+    }
+
+    progress: list[tuple[int, int]] = []
+    fetcher = make_fetcher(cache_dir, StubSession(known))
+    bulk = fetcher.get_bulk_primary_categories(
+        package_ids,
+        progress_callback=lambda done, total: progress.append((done, total)),
+    )
+    assert bulk == expected
+    assert progress[-1] == (len(package_ids), len(package_ids))
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+
+
+def test_rate_limit_allows_burst_then_spaces(clock, cache_dir):
+    """RATE_LIMIT_BURST requests should start at once, later ones spaced out."""
+    fetcher = make_fetcher(cache_dir, StubSession({}))
+    burst = metadata_config.RATE_LIMIT_BURST
+    interval = fetcher_config.RATE_LIMIT_INTERVAL
+
+    for _ in range(burst + 3):
+        fetcher._rate_limit()
+    assert clock.sleeps == pytest.approx([interval] * 3)
+
+    # An idle period refills the bucket
+    clock.now += interval * burst
+    clock.sleeps.clear()
+    for _ in range(burst):
+        fetcher._rate_limit()
+    assert clock.sleeps == []
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     test_metadata_fetcher()
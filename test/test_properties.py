@@ -4,7 +4,10 @@ Property-based tests for fdroid-metrics using hypothesis.
 
 import pytest
 import pathlib
+import tempfile
+from datetime import date, timedelta
 from hypothesis import given, strategies as st
+from etl.dates import date_from_filename, is_date_string, scan_date_files
 from etl.query_mapper import _normalize
 from etl.security import _is_path_allowed, _get_project_root
 
@@ -236,6 +239,86 @@ def test_app_metrics_merging(data_list: list[dict]):
             assert merged["errors"][error_code]["hits"] == expected_error_hits
 
 
+@given(st.dates())
+def test_dates_valid_date_accepted(day: date):
+    """Every calendar date in YYYY-MM-DD form should be accepted."""
+    assert is_date_string(day.isoformat())
+
+
+@given(
+    st.integers(min_value=1900, max_value=2100),
+    st.integers(min_value=1, max_value=12),
+    st.integers(min_value=28, max_value=31),
+)
+def test_dates_month_end_checked(year: int, month: int, day: int):
+    """Days 28-31 should only be accepted when the month has them."""
+    try:
+        date(year, month, day)
+        expected = True
+    except ValueError:
+        expected = False
+    assert is_date_string(f"{year:04d}-{month:02d}-{day:02d}") == expected
+
+
+def test_dates_invalid_examples_rejected():
+    """Impossible dates and other formats should be rejected."""
+    for value in [
+        "2024-02-30",
+        "2023-02-29",
+        "2024-04-31",
+        "2024-13-01",
+        "2024-00-10",
+        "2024-01-00",
+        "0000-01-01",
+        "\u0662\u0660\u0662\u0664-01-01",
+        "2024-1-01",
+        "24-01-01",
+        "2024-01-01 ",
+        "2024/01/01",
+        "",
+    ]:
+        assert not is_date_string(value), value
+    assert is_date_string("2024-02-29")
+
+
+@given(st.text())
+def test_dates_accepted_strings_are_iso_dates(text: str):
+    """Anything accepted should be exactly a parseable ISO date."""
+    if is_date_string(text):
+        assert date.fromisoformat(text).isoformat() == text
+
+
+@given(st.dates())
+def test_dates_from_filename(day: date):
+    """Only YYYY-MM-DD.json names (or bare dates) should yield a date."""
+    date_str = day.isoformat()
+    assert date_from_filename(f"{date_str}.json") == date_str
+    assert date_from_filename(date_str) == date_str
+    assert date_from_filename(f"{date_str}.yml") is None
+    assert date_from_filename(f"{date_str}.json.tmp") is None
+    assert date_from_filename("index.json") is None
+
+
+@given(
+    st.sets(
+        st.dates(min_value=date(2000, 1, 1), max_value=date(2100, 1, 1)),
+        max_size=10,
+    )
+)
+def test_dates_scan_date_files_sorted(days: set[date]):
+    """scan_date_files should list the dated .json files only, sorted."""
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = pathlib.Path(tmp)
+        for day in days:
+            (directory / f"{day.isoformat()}.json").write_text("{}")
+            (directory / f"{(day + timedelta(days=1)).isoformat()}.yml").write_text("")
+        (directory / "index.json").write_text("[]")
+        (directory / "2024-02-30.json").write_text("{}")
+
+        assert scan_date_files(directory) == sorted(day.isoformat() for day in days)
+        assert scan_date_files(directory / "missing") == []
+
+
 if __name__ == "__main__":
     # If run directly, use pytest
     pytest.main([__file__])
@@ -448,26 +448,24 @@ def show_package_analysis(analyzer: AppMetricsAnalyzer, dates: list) -> None:
                 st.success("Cache cleared!")
                 st.rerun()
 
-        def categorize_package(package_name: str) -> str:
-            """Get the real F-Droid category for a package, with fallback to pattern-based categorization."""
-            return metadata_fetcher.get_primary_category(package_name)
-
         # Show progress while fetching metadata
         progress_text = f"Fetching F-Droid metadata for {len(filtered_df)} packages..."
         progress_bar = st.progress(0, text=progress_text)
 
-        categories = []
-        for i, package_name in enumerate(filtered_df["package_name"]):
-            category = categorize_package(package_name)
-            categories.append(category)
-
-            # Update progress
-            progress = (i + 1) / len(filtered_df)
+        def update_progress(done: int, total: int) -> None:
+            """Report metadata fetch progress on the progress bar."""
             progress_bar.progress(
-                progress, text=f"{progress_text} ({i + 1}/{len(filtered_df)})"
+                done / total if total else 1.0,
+                text=f"{progress_text} ({done}/{total})",
             )
 
-        filtered_df["category"] = categories
+        # Real F-Droid categories, with fallback to pattern-based categorization.
+        # Uncached packages are fetched concurrently.
+        primary_categories = metadata_fetcher.get_bulk_primary_categories(
+            set(filtered_df["package_name"]), progress_callback=update_progress
+        )
+
+        filtered_df["category"] = filtered_df["package_name"].map(primary_categories)
         progress_bar.empty()  # Clear progress bar
         category_stats = (
             filtered_df.groupby("category")["total_hits"].sum().reset_index()